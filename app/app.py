@@ -19,6 +19,12 @@ from pages.p5_machine_learning import render_ml
 # =====================================================
 # PAGE CONFIG
 # =====================================================
+# Set page config phải đặt đầu tiên, nếu nằm sau st nào khác thì sẽ báo lỗi
+st.set_page_config(
+    layout="wide",
+    page_icon="src/assets/icon.png",
+    initial_sidebar_state="expanded")
+
 set_global_css()
 container_title_css()
 
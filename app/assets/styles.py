@@ -3,61 +3,53 @@ import base64
 from PIL import Image
 import io
 
-# Set global CSS styles
-def set_global_css():
-    # Set page config phải đặt đầu tiên, nếu nằm sau st nào khác thì sẽ báo lỗi
-    st.set_page_config(
-        layout="wide",
-        page_icon="src/assets/icon.png",
-        initial_sidebar_state="expanded")
-
-# Chỉnh màu cho cục bộ toàn app
-    bg_color = "#EEF2F6"
-    st.markdown(f"""<style>.stApp {{background-color: {bg_color};}}</style>""", unsafe_allow_html=True)
+# GLOBAL CSS — gộp thành 1 block <style> duy nhất (1 lần st.markdown mỗi rerun)
+BG_COLOR = "#EEF2F6"
 
-    # chỉnh full màn hình
-    st.markdown(
-        """
-        <style>
-        .block-container {
-                padding-top: 0rem;
-                padding-bottom: 2rem;
-                color: black; /* Màu chữ cục bộ container */
-            }
-
-        /* Remove default padding of main block (nếu menu nằm main) */
-        section[data-testid="stMain"] > div {
-            padding: 0 !important;
-            max-width: 100% !important;
-        }
+GLOBAL_CSS = f"""
+    <style>
+    /* Chỉnh màu cho cục bộ toàn app */
+    .stApp {{background-color: {BG_COLOR};}}
 
-        /* Loại bỏ margin bottom mặc định của Streamlit */
-        [data-testid="stVerticalBlock"] > [style*="flex-direction: column"] > [data-testid="element-container"] {
-            margin-bottom: 0 !important;
-        }
-        </style>
-        """,
-        unsafe_allow_html=True
-    )
+    /* chỉnh full màn hình */
+    .block-container {{
+            padding-top: 0rem;
+            padding-bottom: 2rem;
+            color: black; /* Màu chữ cục bộ container */
+        }}
 
-    # xóa header, footer
-    st.markdown("""
-        <style>
-            #MainMenu {visibility: hidden;}
-            header .stAppHeader {visibility: hidden;}
-            footer {visibility: hidden;}
-                
-        /* Ẩn toàn bộ header trên cùng */
-        header[data-testid="stHeader"] {
-            display: none;
-        }
+    /* Remove default padding of main block (nếu menu nằm main) */
+    section[data-testid="stMain"] > div {{
+        padding: 0 !important;
+        max-width: 100% !important;
+    }}
+
+    /* Loại bỏ margin bottom mặc định của Streamlit */
+    [data-testid="stVerticalBlock"] > [style*="flex-direction: column"] > [data-testid="element-container"] {{
+        margin-bottom: 0 !important;
+    }}
+
+    /* xóa header, footer */
+    #MainMenu {{visibility: hidden;}}
+    header .stAppHeader {{visibility: hidden;}}
+    footer {{visibility: hidden;}}
+
+    /* Ẩn toàn bộ header trên cùng */
+    header[data-testid="stHeader"] {{
+        display: none;
+    }}
+
+    /* Đẩy nội dung lên sát trên */
+    div[data-testid="stAppViewContainer"] {{
+        padding-top: 0;
+    }}
+    </style>
+"""
 
-        /* Đẩy nội dung lên sát trên */
-        div[data-testid="stAppViewContainer"] {
-            padding-top: 0;
-        }
-        </style>
-    """, unsafe_allow_html=True)
+# Set global CSS styles
+def set_global_css():
+    # st.set_page_config nằm ở đầu app/app.py (chỉ gọi 1 lần)
+    st.markdown(GLOBAL_CSS, unsafe_allow_html=True)
 
 # OPTION MENU CSS
 # def option_menu_css():
@@ -41,8 +41,9 @@ from streamlit_extras.stylable_container import stylable_container
 from assets.styles import stylable_container_pipeline_css, stylable_container_pipeline_monitor_css, stylable_container_logs_css, custom_line_vertical, stylable_container_mapping_app_css
 
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 import importlib.util
-import io, sys, traceback
+import os, subprocess, sys, traceback
 import pandas as pd
 
 ROOT = Path(__file__).resolve().parents[2]
@@ -53,39 +54,52 @@ if str(ROOT) not in sys.path:
 from pipeline.tools.s2_0_column_mapper_app import render as render_s2_0
 
 # =====================================================
-# PRINT CAPTURE CLASS
+# BACKGROUND STEP EXECUTION
 # =====================================================
-class PrintCapture(io.StringIO):
-    def __init__(self, log_placeholder):
-        super().__init__()
-        self.log_placeholder = log_placeholder
-        self.buffer = []
-        self.flush_counter = 0
-    
-    def write(self, text):
-        if text.strip():
-            if "pipeline_logs" not in st.session_state:
-                st.session_state.pipeline_logs = []
-            
-            st.session_state.pipeline_logs.append(text)
-            self.buffer.append(text)
-            self.flush_counter += 1
-            
-            # Flush every 5 writes hoặc nếu có newline
-            if self.flush_counter >= 5 or '\n' in text:
-                self.flush()
-        
-        return len(text)
-    
-    def flush(self):
-        """Force update placeholder"""
-        if self.buffer:
-            self.log_placeholder.code(
-                "".join(st.session_state.pipeline_logs[-500:]),
-                language="bash"
-            )
-            self.buffer = []
-            self.flush_counter = 0
+# Step chạy trong process con → stdout tách khỏi Streamlit, UI không bị đứng
+STEP_RUNNER = (
+    "import importlib.util, sys\n"
+    "from pathlib import Path\n"
+    "spec = importlib.util.spec_from_file_location(sys.argv[1], sys.argv[2])\n"
+    "module = importlib.util.module_from_spec(spec)\n"
+    "spec.loader.exec_module(module)\n"
+    "if not hasattr(module, 'run'):\n"
+    "    raise RuntimeError(f'{sys.argv[1]} has no run() function')\n"
+    "module.run(target_files=[Path(sys.argv[3])])\n"
+)
+
+# Chu kỳ (giây) fragment log tự refresh khi đang có step chạy
+LOG_POLL_INTERVAL = 0.5
+
+# Giới hạn log giữ trong session (bộ nhớ) và số dòng render ra st.code mỗi lần refresh
+LOG_MAX_LINES = 2000
+LOG_RENDER_LINES = 500
+
+@st.cache_resource
+def get_step_executor():
+    """1 worker duy nhất → các step vẫn chạy tuần tự, nhưng không chặn script thread"""
+    return ThreadPoolExecutor(max_workers=1, thread_name_prefix="pipeline_step")
+
+def run_step_in_subprocess(step_key: str, file_path: Path, log_lines: list) -> int:
+    """
+    Chạy 1 step cho 1 file trong process con, đọc stdout từng dòng vào log_lines.
+    Chạy trên worker thread → KHÔNG được đụng tới st.session_state ở đây.
+    """
+    proc = subprocess.Popen(
+        [sys.executable, "-u", "-c", STEP_RUNNER, step_key, str(PIPELINE_STEPS[step_key]), str(file_path)],
+        cwd=str(ROOT),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        encoding="utf-8",
+        errors="replace",
+        env={**os.environ, "PYTHONIOENCODING": "utf-8"},
+    )
+
+    for line in proc.stdout:
+        log_lines.append(line)
+
+    return proc.wait()
 
 # =====================================================
 # PATH
@@ -113,6 +127,10 @@ PIPELINE_STEPS = {
     "s2.7": ROOT / "pipeline" / "step2_processing" / "s2_7_validating_salary_exp.py"
 }
 
+# Thứ tự step cố định + index tra O(1), khỏi list(...).index() mỗi lần rerun
+STEP_KEYS = tuple(PIPELINE_STEPS)
+STEP_INDEX = {step_key: idx for idx, step_key in enumerate(STEP_KEYS)}
+
 # Để check trong folder file có tồn tại chưa để check Done
 STEP_OUTPUT_DIRS = {
     "s2.1": ROOT / "data" / "data_processing" / "s2.1_data_mapped",
@@ -196,6 +214,9 @@ def init_session_state():
     # REALTIME EXECUTION STATE
     if "is_running" not in st.session_state:
         st.session_state.is_running = False
+
+    if "pipeline_job" not in st.session_state:
+        st.session_state.pipeline_job = None
     
     if "current_file_idx" not in st.session_state:
         st.session_state.current_file_idx = 0
@@ -223,20 +244,27 @@ def init_session_state():
 def execute_pipeline_realtime():
     """
     CORE REALTIME LOGIC:
-    - Execute exactly 1 step for 1 file
-    - Update session state
-    - Rerun to render UI
+    - If a step job is in flight → return immediately (log fragment polls it)
+    - If the job finished → record status, advance, rerun
+    - Otherwise submit exactly 1 step for 1 file to the background executor
     """
     if not st.session_state.is_running:
         return
-    
+
+    job = st.session_state.pipeline_job
+    if job is not None:
+        if not job["future"].done():
+            return
+
+        finish_pipeline_job(job)
+        st.rerun()
+        return
+
     # Get execution context
     target_files_list = sorted(list(st.session_state.pipeline_state.keys()))
-    step_keys = list(PIPELINE_STEPS.keys())
-    
-    start_idx = step_keys.index(st.session_state.start_step_key)
-    end_idx = step_keys.index(st.session_state.end_step_key)
-    steps_to_run = step_keys[start_idx:end_idx + 1]
+    start_idx = STEP_INDEX[st.session_state.start_step_key]
+    end_idx = STEP_INDEX[st.session_state.end_step_key]
+    steps_to_run = STEP_KEYS[start_idx:end_idx + 1]
     
     file_idx = st.session_state.current_file_idx
     step_idx = st.session_state.current_step_idx
@@ -260,14 +288,11 @@ def execute_pipeline_realtime():
     file_name = target_files_list[file_idx]
     step_key = steps_to_run[step_idx]
 
-    step_keys_all = list(PIPELINE_STEPS.keys())
-    step_idx_all = step_keys_all.index(step_key)
-
     # FIX: resolve đúng input file theo step trước
     if step_key == "s2.1":
         file_path = DATA_EXTRACTED_DIR / file_name
     else:
-        prev_step = step_keys_all[step_idx_all - 1]
+        prev_step = STEP_KEYS[STEP_INDEX[step_key] - 1]
         prev_dir = STEP_OUTPUT_DIRS[prev_step]
         prev_dir.mkdir(parents=True, exist_ok=True)
 
@@ -299,46 +324,63 @@ def execute_pipeline_realtime():
             for f in out_dir.glob(f"{prefix}*{stem}*.csv"):
                 f.unlink()
 
-    print(
+    st.session_state.pipeline_logs.append(
         f"[PIPELINE] Running {step_key} "
         f"({st.session_state.current_file_idx + 1}/"
-        f"{len(target_files_list)}) → {file_name}"
+        f"{len(target_files_list)}) → {file_name}\n"
     )
 
     st.session_state.pipeline_state[file_name][step_key] = "running"
-    
-    # ===== FIX: DÙNG PLACEHOLDER ĐÃ LƯU TRONG SESSION STATE =====
-    old_stdout, old_stderr = sys.stdout, sys.stderr
-    pc = PrintCapture(st.session_state.pipeline_log_placeholder)
-    sys.stdout = pc
-    sys.stderr = pc
-    
+
+    # ===== SUBMIT STEP → WORKER THREAD (script thread trả về event loop ngay) =====
+    # Worker chỉ append vào list log có sẵn, không truy cập session_state
+    future = get_step_executor().submit(
+        run_step_in_subprocess,
+        step_key,
+        file_path,
+        st.session_state.pipeline_logs,
+    )
+
+    st.session_state.pipeline_job = {
+        "future": future,
+        "file_name": file_name,
+        "step_key": step_key,
+    }
+
+    # Rerun để fragment log bật chế độ polling
+    st.rerun()
+
+def finish_pipeline_job(job: dict):
+    """Ghi nhận kết quả của step vừa chạy xong và chuyển sang task tiếp theo"""
+    file_name = job["file_name"]
+    step_key = job["step_key"]
+    st.session_state.pipeline_job = None
+
+    # Step vừa ghi file output mới → bỏ cache danh sách file
+    scan_csv_files.clear()
+
     try:
-        # ===== FIX: STATUS HIỂN THỊ VÀO ĐÚNG PLACEHOLDER =====
-        with st.session_state.pipeline_status_placeholder:
-            with st.status(f"⏳ {step_key} → {file_name}", expanded=True) as status:
-                run_step_for_single_file(step_key, file_path)
-                st.session_state.pipeline_state[file_name][step_key] = "done"
+        returncode = job["future"].result()
+    except Exception:
+        st.session_state.pipeline_logs.append(traceback.format_exc())
+        returncode = -1
 
-            st.session_state.current_step_idx += 1
-            st.rerun()
-            
-    except Exception as e:
-        print(traceback.format_exc())
-        st.session_state.pipeline_state[file_name][step_key] = "fail"
-        
-        # Mark downstream steps as skipped
-        for s in get_next_steps(step_key):
-            st.session_state.pipeline_state[file_name][s] = "skipped"
-        
-        st.error(f"❌ {step_key} failed: {file_name}")
-    
-    finally:
-        # Force final flush
-        if hasattr(pc, 'flush'):
-            pc.flush()
-        
-        sys.stdout, sys.stderr = old_stdout, old_stderr
+    if returncode == 0:
+        st.session_state.pipeline_state[file_name][step_key] = "done"
+        st.session_state.current_step_idx += 1
+        return
+
+    st.session_state.pipeline_state[file_name][step_key] = "fail"
+
+    # Mark downstream steps as skipped
+    for s in get_next_steps(step_key):
+        st.session_state.pipeline_state[file_name][s] = "skipped"
+
+    # File lỗi → chuyển sang file tiếp theo
+    st.session_state.current_file_idx += 1
+    st.session_state.current_step_idx = 0
+
+    st.toast(f"❌ {step_key} failed: {file_name}")
 
 # =====================================================
 # RUN STEPS DIALOG
@@ -391,45 +433,45 @@ def init_pipeline_state():
             "s1.1": "done",
         }
 
-        # =================================================
-        # AUTO-DETECT STEP STATUS FROM FILE SYSTEM
-        # =================================================
+    # =================================================
+    # AUTO-DETECT STEP STATUS FROM FILE SYSTEM
+    # =================================================
 
-        # s2.1 → s2.7: check file cùng tên trong đúng output dir
-        for file_name in pipeline_state.keys():
-            stem = Path(file_name).stem
+    # s2.1 → s2.7: check file cùng tên trong đúng output dir
+    for file_name in pipeline_state.keys():
+        stem = Path(file_name).stem
 
-            for step, out_dir in STEP_OUTPUT_DIRS.items():
-                prefix = STEP_FILE_PREFIX[step]
+        for step, out_dir in STEP_OUTPUT_DIRS.items():
+            prefix = STEP_FILE_PREFIX[step]
 
-                if not out_dir.exists():
-                    pipeline_state[file_name][step] = "not_started"
-                    continue
+            if not out_dir.exists():
+                pipeline_state[file_name][step] = "not_started"
+                continue
 
-                pattern = f"{prefix}*{stem}*.csv"
-                matched_files = list(out_dir.glob(pattern))
+            pattern = f"{prefix}*{stem}*.csv"
+            matched_files = list(out_dir.glob(pattern))
 
-                pipeline_state[file_name][step] = "done" if matched_files else "not_started"
+            pipeline_state[file_name][step] = "done" if matched_files else "not_started"
 
-        # # s2.8: combined step (single global file)
-        # combined_file = (
-        #     ROOT / "data" / "data_processing" / "s2.8_data_combined" / "combined_all_sources.csv"
-        # )
+    # # s2.8: combined step (single global file)
+    # combined_file = (
+    #     ROOT / "data" / "data_processing" / "s2.8_data_combined" / "combined_all_sources.csv"
+    # )
 
-        # s2_8_done = combined_file.exists()
+    # s2_8_done = combined_file.exists()
 
-        # for file_name in pipeline_state.keys():
-        #     pipeline_state[file_name]["s2.8"] = "done" if s2_8_done else "not_started"
+    # for file_name in pipeline_state.keys():
+    #     pipeline_state[file_name]["s2.8"] = "done" if s2_8_done else "not_started"
 
-        # # s2.9: final ERD tables
-        # processed_dir = ROOT / "data" / "data_processed"
+    # # s2.9: final ERD tables
+    # processed_dir = ROOT / "data" / "data_processed"
 
-        # s2_9_done = processed_dir.exists() and any(
-        #     p.suffix == ".csv" for p in processed_dir.iterdir()
-        # )
+    # s2_9_done = processed_dir.exists() and any(
+    #     p.suffix == ".csv" for p in processed_dir.iterdir()
+    # )
 
-        # for file_name in pipeline_state.keys():
-        #     pipeline_state[file_name]["s2.9"] = "done" if s2_9_done else "not_started"
+    # for file_name in pipeline_state.keys():
+    #     pipeline_state[file_name]["s2.9"] = "done" if s2_9_done else "not_started"
 
     return pipeline_state
 
@@ -437,11 +479,9 @@ def init_pipeline_state():
 # HELPER
 # =====================================================
 def get_next_steps(step_key):
-    step_keys = list(PIPELINE_STEPS.keys())
-    if step_key not in step_keys:
+    if step_key not in STEP_INDEX:
         return []
-    idx = step_keys.index(step_key)
-    return step_keys[idx + 1:]
+    return STEP_KEYS[STEP_INDEX[step_key] + 1:]
 
 def detect_step_done(step_key: str, file_name: str) -> bool:
     out_dir = STEP_OUTPUT_DIRS.get(step_key)
@@ -452,6 +492,30 @@ def detect_step_done(step_key: str, file_name: str) -> bool:
     prefix = STEP_FILE_PREFIX[step_key]
     return any(out_dir.glob(f"{prefix}*{stem}*.csv"))
 
+@st.cache_data(ttl=5, show_spinner=False)
+def scan_csv_files(dir_path: str) -> list[tuple[str, str, float]]:
+    """
+    Liệt kê file CSV trong 1 folder output → [(name, path, mtime)], sort theo tên.
+    Cache ngắn (ttl) để mỗi lần rerun không phải quét lại ổ đĩa;
+    os.scandir trả về stat cache sẵn, không tạo Path object cho từng entry.
+    """
+    if not os.path.isdir(dir_path):
+        return []
+
+    with os.scandir(dir_path) as it:
+        entries = [
+            (e.name, e.path, e.stat().st_mtime)
+            for e in it
+            if e.is_file() and e.name.endswith(".csv")
+        ]
+
+    return sorted(entries)
+
+@st.cache_data(show_spinner=False)
+def load_csv_preview(path: str, mtime: float, nrows: int = 200) -> pd.DataFrame:
+    """mtime nằm trong cache key → file bị ghi đè thì preview tự đọc lại"""
+    return pd.read_csv(path, nrows=nrows)
+
 # =====================================================
 # RUN STEP
 # =====================================================
@@ -494,11 +558,10 @@ def run_single_file_through_pipeline(
     table_placeholder,
     status_placeholder
 ):
-    step_keys = list(PIPELINE_STEPS.keys())
-    start_idx = step_keys.index(start_step)
-    end_idx = step_keys.index(end_step)
+    start_idx = STEP_INDEX[start_step]
+    end_idx = STEP_INDEX[end_step]
     
-    steps_to_run = step_keys[start_idx:end_idx + 1]
+    steps_to_run = STEP_KEYS[start_idx:end_idx + 1]
     
     for step_key in steps_to_run:
         pipeline_state[file_path.name][step_key] = "running"
@@ -563,44 +626,42 @@ def render_file_step_table(pipeline_state: dict, step_order: list[str]):
     st.markdown("#### Files x Steps Table")
     st.markdown("<br>", unsafe_allow_html=True)
 
-    # Tile của cột
-    header_cols = st.columns([3.2, 2] + [1.2] * len(step_order), gap="small")
-    header_cols[0].write("FILE")
-    header_cols[1].write("Origin")
+    # Cả bảng render bằng 1 lần st.markdown (thay vì 1 element cho mỗi ô)
+    st.markdown(build_file_step_table_html(pipeline_state, step_order), unsafe_allow_html=True)
 
-    for i, step in enumerate(step_order):
-        header_cols[i + 2].write(step)
+def build_file_step_table_html(pipeline_state: dict, step_order) -> str:
+    """Pure function: dựng HTML của bảng File x Steps, không gọi Streamlit"""
+    widths = [3.2, 2] + [1.2] * len(step_order)
+    total = sum(widths)
+    colgroup = "".join(f'<col style="width:{w / total:.2%};">' for w in widths)
+
+    cell = "padding:0.25rem 0.5rem;border:none;text-align:left;vertical-align:top;"
+    header = "".join(
+        f'<th style="{cell}font-weight:400;">{label}</th>'
+        for label in ["FILE", "Origin"] + list(step_order)
+    )
+
+    lines = [
+        '<table style="width:100%;table-layout:fixed;border-collapse:collapse;border:none;">',
+        f"<colgroup>{colgroup}</colgroup>",
+        f"<tr>{header}</tr>",
+    ]
 
     for file, info in pipeline_state.items():
-        # Từng dòng của cột
-        cols = st.columns([3.2, 2] + [1.2] * len(step_order), gap="small")
-
-        cols[0].markdown(
-            f"""
-            <div style="
-                min-height:3rem;
-                max-height:3rem;
-                padding-bottom:1rem;   /* CHỪA CHỖ CHO SCROLLBAR */
-                box-sizing:border-box;
-            ">
-                <div style="
-                    height:100%;
-                    overflow-x:scroll;
-                    overflow-y:hidden;
-                    white-space:nowrap;
-                ">
-                    {file}
-                </div>
-            </div>
-            """,
-            unsafe_allow_html=True
+        # Tên file dài → scroll ngang trong ô
+        file_cell = (
+            f'<td style="{cell}"><div style="max-height:3rem;overflow-x:auto;'
+            f'overflow-y:hidden;white-space:nowrap;padding-bottom:1rem;">{file}</div></td>'
         )
+        origin_cell = f'<td style="{cell}">{ORIGIN_ICON.get(info["origin"], "❓")}</td>'
+        step_cells = "".join(
+            f'<td style="{cell}">{STATUS_ICON.get(info.get(step, "not_started"), "⚪")}</td>'
+            for step in step_order
+        )
+        lines.append(f"<tr>{file_cell}{origin_cell}{step_cells}</tr>")
 
-        cols[1].write(ORIGIN_ICON.get(info["origin"], "❓"))
-
-        for i, step in enumerate(step_order):
-            state = info.get(step, "not_started")
-            cols[i + 2].write(STATUS_ICON.get(state, "⚪"))
+    lines.append("</table>")
+    return "".join(lines)
 
 # =====================================================
 # RUN STEP RANGE CONTROL
@@ -677,9 +738,8 @@ def render_run_steps_range(
                 return
 
             if run_skip or run_overwrite:
-                step_keys_all = list(PIPELINE_STEPS.keys())
-                start_idx = step_keys_all.index(step_from)
-                end_idx = step_keys_all.index(step_to)
+                start_idx = STEP_INDEX[step_from]
+                end_idx = STEP_INDEX[step_to]
 
                 if start_idx > end_idx:
                     st.warning("⚠️ Step FROM must be before TO")
@@ -696,6 +756,148 @@ def render_run_steps_range(
                 st.session_state.open_run_steps_dialog = False
                 st.rerun()
 
+# =====================================================
+# LOGS PANEL (FRAGMENT)
+# =====================================================
+PIPELINE_LOGS_INTRO = (
+    "📟 PIPELINE LOGS OUTPUT\n\n"
+    "This panel displays execution messages and logs when the pipeline is running.\n"
+    "Before any step is executed, this area shows an informational note.\n"
+    "Once you run a step, real-time logs will appear here and this note will disappear.\n\n"
+    "PIPELINE STEPS OVERVIEW:\n\n"
+    "s1.1  Crawl data\n"
+    "- Run all crawlers to collect raw job posting data from multiple sources.\n"
+    "- Output raw extracted CSV files for downstream processing.\n\n"
+    "s2.1  Column Mapping (Interactive)\n"
+    "- Manually and automatically map raw source columns to the ERD schema.\n"
+    "- Ensure consistent column structure across all datasets before processing.\n\n"
+    "s2.2  Extract description signals\n"
+    "- Parse job descriptions to extract salary, experience, and remote signals.\n"
+    "- Preserve extracted values without normalization.\n\n"
+    "s2.3  Normalize values\n"
+    "- Standardize city names, countries, currencies, and employment types.\n"
+    "- Convert heterogeneous values into canonical formats.\n\n"
+    "s2.4  Enrich country from city\n"
+    "- Infer country and ISO codes based on city references.\n"
+    "- Fill missing geographic attributes using reference datasets.\n\n"
+    "s2.5  Enrich skill level & category\n"
+    "- Assign skill levels and skill categories using rule-based mappings.\n"
+    "- Improve skill-related consistency across job postings.\n\n"
+    "s2.6  Standardize role names\n"
+    "- Normalize job titles into predefined canonical role names.\n"
+    "- Reduce title variations and improve role-level analysis.\n\n"
+    "s2.7  Validate salary & experience\n"
+    "- Validate salary ranges and experience values for logical consistency.\n"
+    "- Flag or correct invalid and out-of-range data.\n\n"
+    "▶ Select a step to run and monitor execution logs here.\n"
+)
+
+def render_pipeline_logs():
+    """
+    Log panel chạy trong fragment:
+    - Có step đang chạy → tự refresh mỗi LOG_POLL_INTERVAL giây, chỉ rerun panel này
+    - Step chạy xong → rerun cả app để execute_pipeline_realtime ghi nhận kết quả
+    """
+    run_every = LOG_POLL_INTERVAL if st.session_state.pipeline_job is not None else None
+    st.fragment(run_every=run_every)(_render_pipeline_logs_body)()
+
+def _render_pipeline_logs_body():
+    job = st.session_state.pipeline_job
+
+    st.session_state.pipeline_status_placeholder = st.empty()
+    st.session_state.pipeline_log_placeholder = st.empty()
+
+    st.markdown("""
+        <style>
+        .element-container:has(div[data-testid="stCodeBlock"]) div[data-testid="stCodeBlock"] {
+            max-height: 80vh !important;
+            overflow-y: auto !important;
+            padding-right: 0.5rem !important;
+        }
+        </style>
+    """, unsafe_allow_html=True)
+
+    if job is not None:
+        with st.session_state.pipeline_status_placeholder:
+            st.status(f"⏳ {job['step_key']} → {job['file_name']}", state="running")
+
+    logs = st.session_state.pipeline_logs
+
+    # Cắt bớt log cũ tại chỗ (del slice là atomic, worker thread vẫn append an toàn)
+    if len(logs) > LOG_MAX_LINES:
+        del logs[:-LOG_MAX_LINES]
+
+    if not logs:
+        st.session_state.pipeline_log_placeholder.code(PIPELINE_LOGS_INTRO, language="bash")
+    else:
+        tail = logs[-LOG_RENDER_LINES:]
+        st.session_state.pipeline_log_placeholder.code("".join(tail), language="bash")
+
+        if len(logs) > len(tail):
+            st.caption(f"Showing last {len(tail)} of {len(logs)} log lines")
+
+    if job is not None and job["future"].done():
+        finish_pipeline_job(job)
+        st.rerun()
+
+# =====================================================
+# OUTPUT TABS (FRAGMENTS)
+# =====================================================
+# Mở expander / tương tác dataframe trong tab chỉ rerun fragment của tab đó,
+# không render lại tracking table + toàn bộ các tab khác
+@st.fragment
+def render_raw_files_tab():
+    with stylable_container(
+        key="pipeline_files_container_raw",
+        css_styles=stylable_container_logs_css()
+    ):
+        st.markdown("#### Source Files")
+        st.caption("Preview first 200 rows per file")
+
+        raw_files = {name: (path, mtime) for name, path, mtime in scan_csv_files(str(DATA_EXTRACTED_DIR))}
+
+        for file_name in sorted(st.session_state.pipeline_state.keys()):
+            if file_name not in raw_files:
+                continue
+
+            file_path, mtime = raw_files[file_name]
+
+            with st.expander(f"📄 {file_name}", expanded=False):
+                try:
+                    df = load_csv_preview(file_path, mtime)
+                    st.dataframe(df, width="stretch")
+                    st.caption(f"Showing first {len(df)} rows")
+                except Exception as e:
+                    st.error(f"❌ Cannot preview file: {str(e)}")
+
+@st.fragment
+def render_step_output_tab(step_key: str):
+    out_dir = STEP_OUTPUT_DIRS[step_key]
+
+    with stylable_container(
+        key=f"pipeline_files_container_{step_key}",
+        css_styles=stylable_container_logs_css()
+    ):
+        st.markdown(f"#### Output Files – {STEP_FILE_NAME.get(step_key, step_key)}")
+
+        if not out_dir.exists():
+            st.info("No output folder found for this step.")
+            return
+
+        files = scan_csv_files(str(out_dir))
+        if not files:
+            st.info("No files generated for this step yet.")
+            return
+
+        for file_name, file_path, mtime in files:
+            with st.expander(f"📄 {file_name}", expanded=False):
+                try:
+                    df = load_csv_preview(file_path, mtime)
+                    st.dataframe(df, width="stretch")
+                    st.caption(f"Showing first {len(df)} rows")
+                except Exception as e:
+                    st.error(f"❌ Cannot preview file: {str(e)}")
+
 # =====================================================
 # MAIN UI
 # =====================================================
@@ -790,113 +992,20 @@ def render_pipeline():
                         key="pipeline_logs_container",
                         css_styles=stylable_container_logs_css()
                     ):
-                        st.session_state.pipeline_status_placeholder = st.empty()
-                        st.session_state.pipeline_log_placeholder = st.empty()
-
-                        st.markdown("""
-                            <style>
-                            .element-container:has(div[data-testid="stCodeBlock"]) div[data-testid="stCodeBlock"] {
-                                max-height: 80vh !important;
-                                overflow-y: auto !important;
-                                padding-right: 0.5rem !important;
-                            }
-                            </style>
-                        """, unsafe_allow_html=True)
-
-                        if not st.session_state.pipeline_logs:
-                            st.session_state.pipeline_log_placeholder.code(
-                                "📟 PIPELINE LOGS OUTPUT\n\n"
-                                "This panel displays execution messages and logs when the pipeline is running.\n"
-                                "Before any step is executed, this area shows an informational note.\n"
-                                "Once you run a step, real-time logs will appear here and this note will disappear.\n\n"
-                                "PIPELINE STEPS OVERVIEW:\n\n"
-                                "s1.1  Crawl data\n"
-                                "- Run all crawlers to collect raw job posting data from multiple sources.\n"
-                                "- Output raw extracted CSV files for downstream processing.\n\n"
-                                "s2.1  Column Mapping (Interactive)\n"
-                                "- Manually and automatically map raw source columns to the ERD schema.\n"
-                                "- Ensure consistent column structure across all datasets before processing.\n\n"
-                                "s2.2  Extract description signals\n"
-                                "- Parse job descriptions to extract salary, experience, and remote signals.\n"
-                                "- Preserve extracted values without normalization.\n\n"
-                                "s2.3  Normalize values\n"
-                                "- Standardize city names, countries, currencies, and employment types.\n"
-                                "- Convert heterogeneous values into canonical formats.\n\n"
-                                "s2.4  Enrich country from city\n"
-                                "- Infer country and ISO codes based on city references.\n"
-                                "- Fill missing geographic attributes using reference datasets.\n\n"
-                                "s2.5  Enrich skill level & category\n"
-                                "- Assign skill levels and skill categories using rule-based mappings.\n"
-                                "- Improve skill-related consistency across job postings.\n\n"
-                                "s2.6  Standardize role names\n"
-                                "- Normalize job titles into predefined canonical role names.\n"
-                                "- Reduce title variations and improve role-level analysis.\n\n"
-                                "s2.7  Validate salary & experience\n"
-                                "- Validate salary ranges and experience values for logical consistency.\n"
-                                "- Flag or correct invalid and out-of-range data.\n\n"
-                                "▶ Select a step to run and monitor execution logs here.\n",
-                                language="bash")
-                        else:
-                            st.session_state.pipeline_log_placeholder.code(
-                                "".join(st.session_state.pipeline_logs[-500:]),
-                                language="bash"
-                            )
+                        render_pipeline_logs()
 
                 # =======================
                 # TAB 1 — RAW DATA (s2.0)
                 # =======================
                 with tabs[1]:
-                    with stylable_container(
-                        key="pipeline_files_container_raw",
-                        css_styles=stylable_container_logs_css()
-                    ):
-                        st.markdown("#### Source Files")
-                        st.caption("Preview first 200 rows per file")
-
-                        for file_name in sorted(st.session_state.pipeline_state.keys()):
-                            file_path = DATA_EXTRACTED_DIR / file_name
-
-                            if not file_path.exists():
-                                continue
-
-                            with st.expander(f"📄 {file_name}", expanded=False):
-                                try:
-                                    df = pd.read_csv(file_path, nrows=200)
-                                    st.dataframe(df, width="stretch")
-                                    st.caption(f"Showing first {len(df)} rows")
-                                except Exception as e:
-                                    st.error(f"❌ Cannot preview file: {str(e)}")
+                    render_raw_files_tab()
 
                 # =======================
                 # TAB 2+ — STEP OUTPUTS
                 # =======================
                 for idx, step_key in enumerate(STEP_OUTPUT_DIRS.keys(), start=2):
-                    out_dir = STEP_OUTPUT_DIRS[step_key]
-
                     with tabs[idx]:
-                        with stylable_container(
-                            key=f"pipeline_files_container_{step_key}",
-                            css_styles=stylable_container_logs_css()
-                        ):
-                            st.markdown(f"#### Output Files – {STEP_FILE_NAME.get(step_key, step_key)}")
-
-                            if not out_dir.exists():
-                                st.info("No output folder found for this step.")
-                                continue
-
-                            files = sorted(out_dir.glob("*.csv"))
-                            if not files:
-                                st.info("No files generated for this step yet.")
-                                continue
-
-                            for file_path in files:
-                                with st.expander(f"📄 {file_path.name}", expanded=False):
-                                    try:
-                                        df = pd.read_csv(file_path, nrows=200)
-                                        st.dataframe(df, width="stretch")
-                                        st.caption(f"Showing first {len(df)} rows")
-                                    except Exception as e:
-                                        st.error(f"❌ Cannot preview file: {str(e)}")
+                        render_step_output_tab(step_key)
 
             with cLeft:
                 with st.container(border=False):
@@ -921,7 +1030,7 @@ def render_pipeline():
 
                     st.markdown("<br>", unsafe_allow_html=True)
 
-                    steps = list(PIPELINE_STEPS.keys())
+                    steps = STEP_KEYS
                     BUTTONS_PER_ROW = 4
 
                     for i in range(0, len(steps), BUTTONS_PER_ROW):
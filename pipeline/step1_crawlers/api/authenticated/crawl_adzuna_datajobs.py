@@ -1,8 +1,17 @@
 import os
-import json
+import time
+import orjson
+import threading
+import multiprocessing
 import requests
 import pandas as pd
+import pyarrow as pa
+import pyarrow.json as pa_json
+import pyarrow.parquet as pq
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
 from dotenv import load_dotenv
 
 # =========================================================
@@ -29,6 +38,43 @@ RAW_DIR.mkdir(parents=True, exist_ok=True)
 PROCESSING_DIR.mkdir(parents=True, exist_ok=True)
 METADATA_DIR.mkdir(parents=True, exist_ok=True)
 
+# =========================================================
+# HTTP SESSION — dùng chung 1 connection pool cho mọi request
+# =========================================================
+PAGE_WORKERS = 4     # số page fetch song song cho 1 country
+COUNTRY_WORKERS = 2  # số country crawl song song
+MIN_REQUEST_INTERVAL = 0.5  # giây giữa 2 request (tính chung mọi thread) → giữ dưới rate limit của API
+
+SESSION = requests.Session()
+SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=COUNTRY_WORKERS,
+        pool_maxsize=PAGE_WORKERS * COUNTRY_WORKERS,
+        # raise_on_status=False: hết retry với 429/5xx thì trả response lỗi (fetch_page xử lý)
+        # thay vì ném RetryError làm dừng cả run 40 country
+        max_retries=Retry(
+            total=3,
+            backoff_factor=0.5,
+            status_forcelist=[429, 500, 502, 503, 504],
+            raise_on_status=False,
+        ),
+    ),
+)
+
+_throttle_lock = threading.Lock()
+_next_request_at = 0.0
+
+def throttle():
+    """Giãn request đều ra theo MIN_REQUEST_INTERVAL cho mọi thread dùng chung SESSION"""
+    global _next_request_at
+    with _throttle_lock:
+        now = time.monotonic()
+        wait = _next_request_at - now
+        _next_request_at = max(now, _next_request_at) + MIN_REQUEST_INTERVAL
+    if wait > 0:
+        time.sleep(wait)
+
 # =========================================================
 # 1. LIST 40 COUNTRIES
 # =========================================================
@@ -55,14 +101,23 @@ def get_existing_pages_and_jobs(country):
 
     json_files = list(country_dir.glob("page_*.json"))
     existing_pages = set()
-    job_ids = set()
 
     for file in json_files:
         try:
-            page_num = int(file.stem.split("_")[1])
-            existing_pages.add(page_num)
+            existing_pages.add(int(file.stem.split("_")[1]))
+        except ValueError:
+            continue
+
+    # all.ndjson chứa mọi job đã lưu (ghi trước page file) → đọc riêng cột id bằng pyarrow
+    # (đa luồng, C-level) thay vì parse đầy đủ từng page_*.json
+    job_ids = load_ndjson_job_ids(country)
+    if job_ids is not None:
+        return existing_pages, job_ids
 
-            data = json.loads(file.read_text(encoding="utf-8"))
+    job_ids = set()
+    for file in json_files:
+        try:
+            data = orjson.loads(file.read_bytes())
             for job in data.get("results", []):
                 job_id = job.get("id")
                 if job_id:
@@ -72,9 +127,109 @@ def get_existing_pages_and_jobs(country):
 
     return existing_pages, job_ids
 
+# =========================================================
+# 2b. MANIFEST — danh sách page đã xử lý xong của 1 country
+# =========================================================
+# Page toàn job trùng không được ghi file → chỉ nhìn file trên disk sẽ crawl lại.
+# Manifest lưu cả những page đó + cờ finished khi đã gặp page rỗng.
+MANIFEST_NAME = "_manifest.json"
+
+def load_manifest(country):
+    manifest_path = RAW_DIR / country / MANIFEST_NAME
+    if not manifest_path.exists():
+        return None
+
+    try:
+        return orjson.loads(manifest_path.read_bytes())
+    except Exception:
+        return None
+
+def save_manifest(country, done_pages, finished):
+    manifest_path = RAW_DIR / country / MANIFEST_NAME
+    manifest_path.write_bytes(orjson.dumps({
+        "done_pages": sorted(done_pages),
+        "finished": finished,
+    }))
+
+# =========================================================
+# 2c. NDJSON — toàn bộ job của 1 country trong 1 file (1 dòng / job)
+# =========================================================
+# Flatten đọc file này bằng pyarrow (1 lần parse C-level) thay vì mở từng page_*.json.
+# Ghi NDJSON TRƯỚC page file → nếu crash giữa chừng chỉ có thể bị trùng job
+# (flatten drop_duplicates theo id), không bao giờ thiếu job.
+NDJSON_NAME = "all.ndjson"
+
+# Cột cố định kiểu string — pyarrow mặc định tự parse "created" (ISO) thành timestamp
+NDJSON_PARSE_OPTIONS = pa_json.ParseOptions(
+    explicit_schema=pa.schema([("id", pa.string()), ("created", pa.string())]),
+    unexpected_field_behavior="infer",
+)
+
+NDJSON_ID_PARSE_OPTIONS = pa_json.ParseOptions(
+    explicit_schema=pa.schema([("id", pa.string())]),
+    unexpected_field_behavior="ignore",
+)
+
+def load_ndjson_job_ids(country):
+    """set id từ all.ndjson, hoặc None nếu chưa có file / file hỏng (crash giữa lúc ghi)"""
+    ndjson_path = RAW_DIR / country / NDJSON_NAME
+    if not ndjson_path.exists():
+        return None
+
+    try:
+        ids = pa_json.read_json(ndjson_path, parse_options=NDJSON_ID_PARSE_OPTIONS)["id"]
+    except pa.ArrowInvalid:
+        return None
+    return {job_id for job_id in ids.unique().to_pylist() if job_id}
+
+def append_ndjson(country, jobs):
+    with open(RAW_DIR / country / NDJSON_NAME, "ab") as f:
+        f.write(b"".join(orjson.dumps(job) + b"\n" for job in jobs))
+
+def rebuild_ndjson(country):
+    """Data cũ chỉ có page_*.json → dựng lại all.ndjson từ các page đó"""
+    country_dir = RAW_DIR / country
+    page_files = sorted(country_dir.glob("page_*.json"), key=lambda f: int(f.stem.split("_")[1]))
+
+    tmp_path = country_dir / (NDJSON_NAME + ".tmp")
+    with open(tmp_path, "wb") as f:
+        for file in page_files:
+            jobs = orjson.loads(file.read_bytes()).get("results", [])
+            f.write(b"".join(orjson.dumps(job) + b"\n" for job in jobs))
+    tmp_path.replace(country_dir / NDJSON_NAME)
+
 # =========================================================
 # 3. CRAWL 1 COUNTRY
 # =========================================================
+def fetch_page(country, page):
+    """Fetch 1 page → dict JSON, hoặc None nếu HTTP lỗi / response không parse được"""
+    url = f"https://api.adzuna.com/v1/api/jobs/{country}/search/{page}"
+    params = {
+        "app_id": APP_ID,
+        "app_key": API_KEY,
+        "results_per_page": 50,
+        "what": "data",
+    }
+
+    throttle()
+    try:
+        response = SESSION.get(url, params=params, timeout=15)
+    except requests.RequestException as e:
+        # Timeout / mất kết nối / hết retry → dừng country này, lần chạy sau resume
+        print(f"❌ REQUEST FAILED at page {page}, country {country}: {e}")
+        return None
+
+    # Body lỗi (sai key, hết quota, 4xx/5xx) cũng là JSON nhưng không có "results"
+    # → không được coi là "hết page", trả None để dừng country mà không ghi finished
+    if not response.ok:
+        print(f"❌ HTTP {response.status_code} at page {page}, country {country}")
+        return None
+
+    try:
+        return response.json()
+    except Exception:
+        return None
+
 def crawl_country(country, pages=200):
     print(f"\n🌍 Crawling: {country}")
     save_dir = RAW_DIR / country
@@ -84,95 +239,116 @@ def crawl_country(country, pages=200):
     existing_pages, existing_job_ids = get_existing_pages_and_jobs(country)
     seen_job_ids = set(existing_job_ids)
 
-    if existing_pages:
-        start_page = max(existing_pages) + 1
-        if start_page > pages:
-            print(f"   ✔ Already crawled full {pages} pages. Skipping.")
-            return
-        print(f"   ↳ Resume crawl from page {start_page}")
-    else:
-        start_page = 1
-        print("   ↳ First time crawling this country")
-
-    # 🔹 Crawl pages
-    for page in range(start_page, pages + 1):
-        url = f"https://api.adzuna.com/v1/api/jobs/{country}/search/{page}"
-        params = {
-            "app_id": APP_ID,
-            "app_key": API_KEY,
-            "results_per_page": 50,
-            "what": "data",
-        }
-
-        response = requests.get(url, params=params)
-        try:
-            data = response.json()
-        except Exception:
-            print(f"❌ ERROR parsing JSON at page {page}, country {country}")
-            break
-
-        results = data.get("results", [])
-        if not results:
-            print(f"→ No more results at page {page}.")
-            break
-
-        new_results = []
-        skipped = 0
-
-        for job in results:
-            job_id = job.get("id")
-
-            if not job_id or job_id in seen_job_ids:
-                skipped += 1
-                continue
+    if existing_pages and not (save_dir / NDJSON_NAME).exists():
+        rebuild_ndjson(country)
 
-            seen_job_ids.add(job_id)
-            new_results.append(job)
+    manifest = load_manifest(country)
+    if manifest is not None:
+        done_pages = set(manifest.get("done_pages", []))
+        finished = manifest.get("finished", False)
+    else:
+        # Data cũ chưa có manifest → coi mọi page ≤ page lớn nhất trên disk là đã xong
+        done_pages = set(range(1, max(existing_pages) + 1)) if existing_pages else set()
+        finished = False
 
-        if not new_results:
-            print(f"   ⏭ Page {page}: all jobs duplicated, skipped.")
-            continue
+    if finished:
+        print("   ✔ Already reached the last page (manifest). Skipping.")
+        return
 
-        data["results"] = new_results
+    pending_pages = [p for p in range(1, pages + 1) if p not in done_pages]
+    if not pending_pages:
+        print(f"   ✔ Already crawled full {pages} pages. Skipping.")
+        return
 
-        save_path = save_dir / f"page_{page}.json"
-        save_path.write_text(json.dumps(data, indent=4), encoding="utf-8")
+    if done_pages:
+        print(f"   ↳ Resume crawl: {len(done_pages)} pages done, {len(pending_pages)} pending")
+    else:
+        print("   ↳ First time crawling this country")
 
-        print(
-            f"   ✓ Saved page {page} "
-            f"(new: {len(new_results)}, skipped: {skipped})"
-        )
+    # 🔹 Crawl pages — fetch từng batch PAGE_WORKERS page song song,
+    #    xử lý kết quả theo đúng thứ tự page để giữ logic dedupe / dừng sớm
+    with ThreadPoolExecutor(max_workers=PAGE_WORKERS) as executor:
+        for i in range(0, len(pending_pages), PAGE_WORKERS):
+            batch = pending_pages[i:i + PAGE_WORKERS]
+            batch_data = executor.map(lambda p: fetch_page(country, p), batch)
+
+            stop = False
+            for page, data in zip(batch, batch_data):
+                if data is None or not isinstance(data.get("results"), list):
+                    print(f"❌ ERROR fetching page {page}, country {country} (will retry next run)")
+                    stop = True
+                    break
+
+                # Chỉ khi response 2xx có "results" rỗng mới là thật sự hết page
+                results = data["results"]
+                if not results:
+                    print(f"→ No more results at page {page}.")
+                    save_manifest(country, done_pages, finished=True)
+                    stop = True
+                    break
+
+                new_results = []
+                skipped = 0
+
+                for job in results:
+                    job_id = job.get("id")
+
+                    if not job_id or job_id in seen_job_ids:
+                        skipped += 1
+                        continue
+
+                    seen_job_ids.add(job_id)
+                    new_results.append(job)
+
+                if new_results:
+                    data["results"] = new_results
+                    append_ndjson(country, new_results)
+
+                    save_path = save_dir / f"page_{page}.json"
+                    save_path.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+
+                    print(
+                        f"   ✓ Saved page {page} "
+                        f"(new: {len(new_results)}, skipped: {skipped})"
+                    )
+                else:
+                    print(f"   ⏭ Page {page}: all jobs duplicated, skipped.")
+
+                done_pages.add(page)
+                save_manifest(country, done_pages, finished=False)
+
+            if stop:
+                break
 
     print(f"✅ DONE {country}")
 
 # =========================================================
-# 4. NORMALIZE 1 JOB
-# =========================================================
-def normalize_job(job):
-    loc = job.get("location", {})
-    area = loc.get("area", [])
-
-    return {
-        "job_id": job.get("id"),
-        "title": job.get("title"),
-        "company_name": job.get("company", {}).get("display_name"),
-        "category": job.get("category", {}).get("label"),
-        "category_tag": job.get("category", {}).get("tag"),
-        "country": area[0] if len(area) > 0 else None,
-        "region": area[1] if len(area) > 1 else None,
-        "city": area[-1] if len(area) > 0 else None,
-        "location_display": loc.get("display_name"),
-        "salary_min": job.get("salary_min"),
-        "salary_max": job.get("salary_max"),
-        "salary_predicted": job.get("salary_is_predicted"),
-        "contract_type": job.get("contract_type"),
-        "contract_time": job.get("contract_time"),
-        "created_at": job.get("created"),
-        "latitude": job.get("latitude"),
-        "longitude": job.get("longitude"),
-        "description": job.get("description"),
-        "redirect_url": job.get("redirect_url")
-    }
+# 4. COLUMN MAPPING (json_normalize key → output column)
+# =========================================================
+# Thứ tự dict = thứ tự cột trong CSV output
+# country / region / city được tách từ list location_area
+ADZUNA_COLUMNS = {
+    "id": "job_id",
+    "title": "title",
+    "company_display_name": "company_name",
+    "category_label": "category",
+    "category_tag": "category_tag",
+    "country": "country",
+    "region": "region",
+    "city": "city",
+    "location_display_name": "location_display",
+    "salary_min": "salary_min",
+    "salary_max": "salary_max",
+    "salary_is_predicted": "salary_predicted",
+    "contract_type": "contract_type",
+    "contract_time": "contract_time",
+    "created": "created_at",
+    "latitude": "latitude",
+    "longitude": "longitude",
+    "description": "description",
+    "redirect_url": "redirect_url",
+    "country_source": "country_source",
+}
 
 
 # =========================================================
@@ -182,45 +358,116 @@ def export_metadata(example_json):
     schema = {k: type(v).__name__ for k, v in example_json.items()}
     meta_file = METADATA_DIR / "adzuna_metadata.json"
 
-    meta_file.write_text(json.dumps(schema, indent=4), encoding="utf-8")
+    meta_file.write_bytes(orjson.dumps(schema, option=orjson.OPT_INDENT_2))
     print(f"📄 Metadata exported → {meta_file}")
 
 
+# =========================================================
+# PARQUET COPY — bản columnar cạnh file CSV (CSV vẫn là input của step 2)
+# =========================================================
+def save_parquet(tables, csv_path):
+    """tables: list pa.Table từng country (cùng cột, kiểu có thể lệch nhau → promote khi concat)"""
+    parquet_path = csv_path.with_suffix(".parquet")
+    try:
+        table = pa.concat_tables(tables, promote_options="permissive")
+        pq.write_table(table, parquet_path, compression="zstd")
+        print(f"💾 Saved Parquet → {parquet_path}")
+    except Exception as e:
+        print(f"⚠ Parquet export skipped: {e}")
+
+
 # =========================================================
 # 6. FLATTEN JSON → CSV
 # =========================================================
+def _flatten_one_country(country_dir):
+    """
+    Đọc job của 1 country → (country, DataFrame phẳng, 1 job mẫu cho metadata).
+    Chạy trong worker process. Ưu tiên all.ndjson (pyarrow), fallback về page_*.json.
+    """
+    country = country_dir.name
+    ndjson_path = country_dir / NDJSON_NAME
+
+    if ndjson_path.exists():
+        try:
+            table = pa_json.read_json(
+                ndjson_path,
+                read_options=pa_json.ReadOptions(block_size=8 << 20),
+                parse_options=NDJSON_PARSE_OPTIONS,
+            )
+            example = table.slice(0, 1).to_pylist()[0] if table.num_rows else None
+
+            # company.display_name → company_display_name (giống json_normalize sep="_")
+            while any(pa.types.is_struct(field.type) for field in table.schema):
+                table = table.flatten()
+            df = table.to_pandas()
+            df.columns = [col.replace(".", "_") for col in df.columns]
+
+            return country, df, example
+        except pa.ArrowInvalid as e:
+            print(f"⚠ {country}: cannot read {NDJSON_NAME} ({e}) → fallback page files")
+
+    results = []
+    for file in sorted(country_dir.glob("page_*.json")):
+        data = orjson.loads(file.read_bytes())
+        results.extend(data.get("results", []))
+
+    example = results[0] if results else None
+    return country, pd.json_normalize(results, sep="_"), example
+
+
+def _to_output_columns(df, country):
+    """DataFrame phẳng của 1 country → đúng cột / thứ tự ADZUNA_COLUMNS"""
+    df["country_source"] = country
+
+    # NDJSON có thể trùng job nếu crawl bị ngắt giữa lúc ghi
+    # (country_source cố định trong 1 country → dedupe theo id là đủ)
+    if "id" in df:
+        df = df.drop_duplicates(subset=["id"], ignore_index=True)
+
+    area = df["location_area"].astype(object) if "location_area" in df else pd.Series(None, index=df.index, dtype=object)
+    df["country"] = area.str[0]
+    df["region"] = area.str[1]
+    df["city"] = area.str[-1]
+
+    return df.reindex(columns=list(ADZUNA_COLUMNS)).rename(columns=ADZUNA_COLUMNS)
+
+
 def flatten_all_countries():
     print("\n📌 Flattening ALL countries into processing layer...")
 
     output_path = PROCESSING_DIR / "adzuna_datajobs_2025.csv"
-    rows, example_saved = [], False
+    example_saved = False
+    total_rows = 0
+    tables = []  # Arrow table từng country cho bản Parquet (concat zero-copy ở cuối)
 
-    for country_dir in RAW_DIR.iterdir():
-        if not country_dir.is_dir():
-            continue
+    country_dirs = sorted(d for d in RAW_DIR.iterdir() if d.is_dir())
 
-        country = country_dir.name
-        print(f"🔍 Flattening {country}...")
+    # Ghi CSV ngay khi từng country xong → không giữ list DataFrame + 1 bản pd.concat khổng lồ
+    with open(output_path, "w", encoding="utf-8", newline="", buffering=1 << 20) as f:
+        # Parse JSON là CPU-bound → mỗi country 1 process (imap giữ thứ tự country cho CSV ổn định)
+        with multiprocessing.Pool(processes=os.cpu_count()) as pool:
+            for country, country_df, example in pool.imap(_flatten_one_country, country_dirs):
+                print(f"🔍 Flattened {country}: {len(country_df)} jobs")
 
-        json_files = sorted(country_dir.glob("page_*.json"))
+                if example is not None and not example_saved:
+                    export_metadata(example)
+                    example_saved = True
 
-        for file in json_files:
-            data = json.loads(file.read_text(encoding="utf-8"))
+                out_df = _to_output_columns(country_df, country)
+                del country_df
 
-            for job in data.get("results", []):
-                row = normalize_job(job)
-                row["country_source"] = country
-                rows.append(row)
+                out_df.to_csv(f, index=False, header=not tables)
+                tables.append(pa.Table.from_pandas(out_df, preserve_index=False))
+                total_rows += len(out_df)
 
-                if not example_saved:
-                    export_metadata(job)
-                    example_saved = True
+        if not tables:
+            pd.DataFrame(columns=list(ADZUNA_COLUMNS.values())).to_csv(f, index=False)
 
-    df = pd.DataFrame(rows)
-    df.to_csv(output_path, index=False, encoding="utf-8")
+    if tables:
+        save_parquet(tables, output_path)
 
-    print(f"\n🎉 DONE! Saved {len(df)} rows → {output_path}")
-    return df
+    print(f"\n🎉 DONE! Saved {total_rows} rows → {output_path}")
+    return total_rows
 
 # =========================================================
 # 7. FULL GLOBAL RUN
@@ -228,8 +475,9 @@ def flatten_all_countries():
 def run_adzuna_datajobs_crawler():
     print("\n🚀 RUNNING GLOBAL ADZUNA PIPELINE...\n")
 
-    for country in COUNTRIES_40:
-        crawl_country(country)
+    # Mỗi country độc lập (folder + manifest riêng) → crawl song song vài country 1 lúc
+    with ThreadPoolExecutor(max_workers=COUNTRY_WORKERS) as executor:
+        list(executor.map(crawl_country, COUNTRIES_40))
 
     flatten_all_countries()
 
@@ -1,8 +1,13 @@
+import re
 import requests
-import json
+import orjson
 import os
 import pandas as pd
+import pyarrow as pa
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
 from dotenv import load_dotenv
 from datetime import datetime
 
@@ -20,6 +25,19 @@ HEADERS = {
     "Authorization-Key": API_KEY,
 }
 
+YEAR_WORKERS = 3  # số năm crawl song song (page trong 1 năm vẫn tuần tự vì dừng ở page rỗng)
+
+# 1 session cho toàn bộ crawl → giữ kết nối keep-alive giữa các page
+SESSION = requests.Session()
+SESSION.headers.update(HEADERS)
+SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_maxsize=YEAR_WORKERS,
+        max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504]),
+    ),
+)
+
 # =========================================================
 # PROJECT FOLDERS
 # =========================================================
@@ -46,8 +64,46 @@ KEYWORDS = [
     "engineer", "scientist",
 ]
 
+# 1 regex duy nhất cho tất cả keyword (match substring, không phân biệt hoa thường)
+# → quét text 1 lần, không cần tạo bản text.lower()
+KEYWORD_RE = re.compile(
+    "|".join(re.escape(kw) for kw in sorted(KEYWORDS, key=len, reverse=True)),
+    re.IGNORECASE,
+)
+
 def is_data_job(text):
-    return any(kw in text.lower() for kw in KEYWORDS)
+    return KEYWORD_RE.search(text) is not None
+
+
+# =========================================================
+# OUTPUT SCHEMA — dtype cố định, khỏi để pandas tự đoán từ list[dict]
+# =========================================================
+USA_SCHEMA = pa.schema([
+    ("id", pa.string()),
+    ("title", pa.string()),
+    ("company", pa.string()),
+    ("location", pa.string()),
+    ("salary_min", pa.float64()),
+    ("salary_max", pa.float64()),
+    ("description", pa.string()),
+    ("year", pa.int64()),
+    ("apply_url", pa.string()),
+])
+
+def to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def jobs_to_dataframe(jobs):
+    """list[dict] → DataFrame Arrow-backed: dựng từng cột theo USA_SCHEMA rồi convert 1 lần"""
+    columns = {name: [job.get(name) for job in jobs] for name in USA_SCHEMA.names}
+    columns["salary_min"] = [to_float(v) for v in columns["salary_min"]]
+    columns["salary_max"] = [to_float(v) for v in columns["salary_max"]]
+
+    table = pa.table(columns, schema=USA_SCHEMA)
+    return table.to_pandas(types_mapper=pd.ArrowDtype)
 
 
 # =========================================================
@@ -66,14 +122,14 @@ def crawl_usajobs_for_year(year):
             "DatePosted": year
         }
 
-        r = requests.get(url, headers=HEADERS, params=params)
-        data = r.json()
+        r = SESSION.get(url, params=params, timeout=15)
+        data = orjson.loads(r.content)
 
         items = data.get("SearchResult", {}).get("SearchResultItems", [])
         if not items:
             break
 
-        print(f"→ Page {page}: {len(items)} jobs")
+        print(f"→ {year} page {page}: {len(items)} jobs")
 
         for item in items:
             job = item.get("MatchedObjectDescriptor", {})
@@ -104,6 +160,18 @@ def crawl_usajobs_for_year(year):
     return jobs
 
 
+# =========================================================
+# PARQUET COPY — bản columnar cạnh file CSV (CSV vẫn là input của step 2)
+# =========================================================
+def save_parquet(df, csv_path):
+    parquet_path = csv_path.with_suffix(".parquet")
+    try:
+        df.to_parquet(parquet_path, engine="pyarrow", compression="zstd", index=False)
+        print(f"💾 Saved Parquet → {parquet_path}")
+    except Exception as e:
+        print(f"⚠ Parquet export skipped: {e}")
+
+
 # =========================================================
 # FULL CRAWL
 # =========================================================
@@ -111,20 +179,24 @@ def run_usa_datajobs_crawler():
     start = 2020
     end = 2025
     all_jobs = []
+    years = range(start, end + 1)
+
+    # Các năm độc lập → fetch song song; map trả kết quả theo đúng thứ tự năm
+    with ThreadPoolExecutor(max_workers=YEAR_WORKERS) as executor:
+        yearly_results = list(executor.map(crawl_usajobs_for_year, years))
 
-    for year in range(start, end + 1):
-        yearly_jobs = crawl_usajobs_for_year(year)
+    for year, yearly_jobs in zip(years, yearly_results):
         all_jobs.extend(yearly_jobs)
 
         raw_path = RAW_DIR / f"{year}.json"
-        with open(raw_path, "w", encoding="utf-8") as f:
-            json.dump(yearly_jobs, f, indent=4, ensure_ascii=False)
+        raw_path.write_bytes(orjson.dumps(yearly_jobs, option=orjson.OPT_INDENT_2))
 
         print(f"✔ Saved RAW JSON → {raw_path}")
 
-    df = pd.DataFrame(all_jobs)
+    df = jobs_to_dataframe(all_jobs)
 
     df.to_csv(csv_path, index=False, encoding="utf-8-sig")
+    save_parquet(df, csv_path)
 
     print(f"\n🎉 DONE: Saved CSV → {csv_path}")
     print(f"Total jobs collected: {len(all_jobs)}")
@@ -139,8 +211,7 @@ def run_usa_datajobs_crawler():
     }
 
     meta_file = META_DIR / "usa_government_metadata.json"
-    with open(meta_file, "w", encoding="utf-8") as f:
-        json.dump(metadata, f, indent=2, ensure_ascii=False)
+    meta_file.write_bytes(orjson.dumps(metadata, option=orjson.OPT_INDENT_2))
 
     print(f"📝 Metadata saved → {meta_file}")
 
@@ -7,8 +7,10 @@ Chuẩn hóa theo dự án:
 - Processed CSV → data/data_processing/remoteok_datajobs_2025.csv
 """
 
+import re
 import requests
-import json
+import ijson
+import orjson
 import pandas as pd
 from pathlib import Path
 from datetime import datetime
@@ -29,6 +31,8 @@ PROC_DIR = ROOT / "data" / "data_processing" / "s2.0_data_extracted"
 PROC_DIR.mkdir(parents=True, exist_ok=True)
 output_path = PROC_DIR / "remoteok_datajobs_2025.csv"
 
+CHUNK_SIZE = 64 * 1024
+
 # ==========================================================
 # 1) Download ALL RemoteOK job history
 # ==========================================================
@@ -36,24 +40,43 @@ def download_remoteok():
     url = "https://remoteok.com/api"
     print("📡 Downloading RemoteOK job archive...")
 
-    r = requests.get(
+    save_path = RAW_DIR / "all_raw_results.json"
+
+    tmp_path = save_path.with_name(save_path.name + ".tmp")
+
+    # Stream thẳng bytes xuống disk — không parse toàn bộ archive trong RAM.
+    # Ghi ra file .tmp, chỉ thay file raw cũ khi đã nhận đủ body
+    # → HTTP lỗi / rớt kết nối giữa chừng không xóa mất snapshot tốt lần trước
+    with requests.get(
         url,
         headers={
             "User-Agent": "Mozilla/5.0",
             "Accept": "application/json",
         },
+        stream=True,
         timeout=30
-    )
-
-    data = r.json()
-    data = data[1:]  # first element is metadata
+    ) as r:
+        r.raise_for_status()
+        try:
+            with open(tmp_path, "wb") as f:
+                for chunk in r.iter_content(CHUNK_SIZE):
+                    f.write(chunk)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
 
-    save_path = RAW_DIR / "all_raw_results.json"
-    with open(save_path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    tmp_path.replace(save_path)
 
     print(f"✅ RAW saved → {save_path}")
-    return data
+    return save_path
+
+
+def iter_remoteok_jobs(raw_path):
+    """Yield từng job trong file raw (bỏ phần tử đầu là metadata)."""
+    with open(raw_path, "rb") as f:
+        items = ijson.items(f, "item", use_float=True)
+        next(items, None)  # first element is metadata
+        yield from items
 
 
 # ==========================================================
@@ -70,25 +93,32 @@ KEYWORDS = [
 ]
 
 
+# 1 regex duy nhất cho tất cả keyword (match substring, không phân biệt hoa thường)
+KEYWORD_RE = re.compile(
+    "|".join(re.escape(kw) for kw in sorted(KEYWORDS, key=len, reverse=True)),
+    re.IGNORECASE,
+)
+
+
 def is_data_job(job):
     text = (
         (job.get("position") or "") + " " +
         (job.get("description") or "") + " " +
         " ".join(job.get("tags") or [])
-    ).lower()
+    )
 
-    return any(kw in text for kw in KEYWORDS)
+    return KEYWORD_RE.search(text) is not None
 
 
 # ==========================================================
 # 3) FILTER 2018–2025
 # ==========================================================
-def filter_data_jobs(raw):
+def filter_data_jobs(raw_path):
     print("🔍 Filtering Data-related jobs (2018–2025)...")
 
     rows = []
 
-    for job in raw:
+    for job in iter_remoteok_jobs(raw_path):
         # Parse year
         try:
             year = datetime.fromtimestamp(job.get("epoch", 0)).year
@@ -126,11 +156,24 @@ def filter_data_jobs(raw):
 def save_csv(rows):
     df = pd.DataFrame(rows)
     df.to_csv(output_path, index=False, encoding="utf-8-sig")
+    save_parquet(df, output_path)
 
     print(f"💾 Saved CSV → {output_path}")
     return output_path
 
 
+# ==========================================================
+# PARQUET COPY — bản columnar cạnh file CSV (CSV vẫn là input của step 2)
+# ==========================================================
+def save_parquet(df, csv_path):
+    parquet_path = csv_path.with_suffix(".parquet")
+    try:
+        df.to_parquet(parquet_path, engine="pyarrow", compression="zstd", index=False)
+        print(f"💾 Saved Parquet → {parquet_path}")
+    except Exception as e:
+        print(f"⚠ Parquet export skipped: {e}")
+
+
 # ==========================================================
 # 5) Save metadata
 # ==========================================================
@@ -155,8 +198,7 @@ def save_metadata(total, csv_path):
     }
 
     meta_file = META_DIR / "remoteok_metadata.json"
-    with open(meta_file, "w", encoding="utf-8") as f:
-        json.dump(meta, f, indent=2, ensure_ascii=False)
+    meta_file.write_bytes(orjson.dumps(meta, option=orjson.OPT_INDENT_2))
 
     print(f"📝 Metadata saved → {meta_file}")
 
@@ -168,8 +210,8 @@ def run_remoteok_datajobs_crawler():
     print("🚀 START REMOTEOK DATAJOBS CRAWLER (2020–2025)")
     print("=" * 60)
 
-    raw = download_remoteok()
-    data_jobs = filter_data_jobs(raw)
+    raw_path = download_remoteok()
+    data_jobs = filter_data_jobs(raw_path)
     csv_path = save_csv(data_jobs)
     save_metadata(len(data_jobs), csv_path)
 
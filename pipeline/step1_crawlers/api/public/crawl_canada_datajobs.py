@@ -2,18 +2,34 @@
 """
 Crawler Canada Government DataJobs (2020–2025)
 Folder structure (same style as Adzuna):
-- Raw JSON → data/data_raw/canada_government_datajobs_2020-2025/
+- Raw NDJSON → data/data_raw/canada_government_datajobs_2020-2025/all_raw_results.ndjson
 - Metadata → data/metadata
-- CSV → data/data_processing/canada_government_datajobs_2020-2025.csv
+- Parquet + CSV → data/data_processing/s2.0_data_extracted/canada_government_datajobs_2020-2025.{parquet,csv}
 """
 
+import re
+import time
+import hashlib
 import requests
+import orjson
 import pandas as pd
-import time
-import json
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
 from datetime import datetime
 
+# brotli (optional): có thì xin response nén br, urllib3 tự giải nén
+try:
+    import brotli  # noqa: F401
+    HAS_BROTLI = True
+except ImportError:
+    HAS_BROTLI = False
+
 
 # ==================================================================
 # 1. KEYWORDS
@@ -29,12 +45,24 @@ KEYWORDS = [
     "ml"
 ]
 
+# Tất cả keyword OR trong 1 query → 1 lượt crawl thay vì len(KEYWORDS) lượt
+KEYWORD_QUERY = " OR ".join(f'"{kw}"' for kw in KEYWORDS)
+
+# Gắn lại keyword nào đã match (provenance) bằng 1 regex duy nhất trên title + notes + tags
+# → quét text 1 lần cho mọi keyword; \b để giống cách Solr match theo token ("ai" không match "said")
+KEYWORD_RE = re.compile(
+    r"\b(?:" + "|".join(re.escape(kw) for kw in sorted(KEYWORDS, key=len, reverse=True)) + r")\b",
+    re.IGNORECASE,
+)
+KEYWORD_BY_LOWER = {kw.lower(): kw for kw in KEYWORDS}
+
 
 # ==================================================================
 # 2. PATH CONFIG (identical to Adzuna style)
 # ==================================================================
 BASE_URL = "https://open.canada.ca/data/api/3/action/package_search"
 ROWS_PER_PAGE = 1000
+PAGE_WORKERS = 4  # số page fetch song song (sau khi page đầu trả về count)
 
 ROOT = Path(__file__).resolve().parents[4]
 
@@ -42,61 +70,131 @@ RAW_DIR = ROOT / "data" / "data_raw" / "canada_government_datajobs_2020-2025"
 META_DIR = ROOT / "data" / "metadata" / "source"
 PROC_DIR = ROOT / "data" / "data_processing" / "s2.0_data_extracted"
 csv_file = PROC_DIR / "canada_government_datajobs_2020-2025.csv"
+parquet_file = csv_file.with_suffix(".parquet")
+
+# Parquet là output chính; CSV vẫn bật mặc định vì step 2 (s2.1 mapping) đọc *.csv
+WRITE_CSV = True
 
 RAW_DIR.mkdir(parents=True, exist_ok=True)
 META_DIR.mkdir(parents=True, exist_ok=True)
 PROC_DIR.mkdir(parents=True, exist_ok=True)
 
-final_records = []
+
+# ==================================================================
+# HTTP SESSION — dùng chung 1 connection pool cho mọi keyword / page
+# ==================================================================
+SESSION = requests.Session()
+SESSION.headers.update({
+    "User-Agent": "data-industry-insights-crawler/1.0",
+    # Chỉ xin "br" khi decode được, nếu không server trả br mà requests không đọc được
+    "Accept-Encoding": "br, gzip, deflate" if HAS_BROTLI else "gzip, deflate",
+})
+SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=16,
+        pool_maxsize=32,
+        # Lỗi tạm thời (429 / 5xx / mất kết nối) → tự retry với backoff, tôn trọng Retry-After
+        max_retries=Retry(
+            total=5,
+            backoff_factor=0.5,
+            status_forcelist=[429, 500, 502, 503, 504],
+            respect_retry_after_header=True,
+        ),
+    ),
+)
+
+
+# ==================================================================
+# HTTP CACHE — response lưu trên disk theo (fq, start), hết hạn sau TTL
+# ==================================================================
+# Chạy lại pipeline trong ngày không phải gọi lại toàn bộ API
+HTTP_CACHE_DIR = RAW_DIR / ".http_cache"
+HTTP_CACHE_TTL = 24 * 3600  # giây
+HTTP_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+
+def cache_path(fq: str, start: int) -> Path:
+    key = hashlib.sha1(f"{fq}|{start}|{ROWS_PER_PAGE}".encode("utf-8")).hexdigest()
+    return HTTP_CACHE_DIR / f"{key}.json"
+
+def load_cached(path: Path):
+    try:
+        if time.time() - path.stat().st_mtime > HTTP_CACHE_TTL:
+            return None
+        return orjson.loads(path.read_bytes())
+    except (OSError, orjson.JSONDecodeError):
+        return None
+
+def save_cached(path: Path, content: bytes):
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_bytes(content)
+    tmp_path.replace(path)
 
 
 # ==================================================================
 # 3. API SEARCH
 # ==================================================================
-def search_keyword(keyword: str, start_year=2020, end_year=2025):
-    print(f"\n[+] Searching: '{keyword}' ({start_year}-{end_year})")
+def fetch_page(fq: str, start: int):
+    """1 page CKAN package_search → dict JSON, hoặc None nếu API báo success=false (ưu tiên cache trên disk)"""
+    cached_file = cache_path(fq, start)
+    data = load_cached(cached_file)
+    if data is not None:
+        return data
+
+    params = {
+        "q": "",
+        "fq": fq,
+        "rows": ROWS_PER_PAGE,
+        "start": start,
+        "sort": "metadata_modified desc"
+    }
+
+    # Retry đã nằm ở adapter → hết retry mà vẫn lỗi thì raise luôn, không âm thầm bỏ keyword
+    resp = SESSION.get(BASE_URL, params=params, timeout=25)
+    resp.raise_for_status()
+    data = orjson.loads(resp.content)
 
-    all_results = []
-    start = 0
+    if not data.get("success"):
+        print("   API ERROR:", data)
+        return None
 
-    while True:
-        year_filter = " OR ".join([str(y) for y in range(start_year, end_year + 1)])
-        fq = f'"{keyword}" AND ({year_filter})'
+    save_cached(cached_file, resp.content)
+    return data
 
-        params = {
-            "q": "",
-            "fq": fq,
-            "rows": ROWS_PER_PAGE,
-            "start": start,
-            "sort": "metadata_modified desc"
-        }
 
-        try:
-            resp = requests.get(BASE_URL, params=params, timeout=25)
-            resp.raise_for_status()
-            data = resp.json()
-        except Exception as e:
-            print("   ERROR:", e)
-            break
+def search_keyword(query: str, start_year=2020, end_year=2025):
+    """query: mệnh đề Solr đã quote sẵn, vd '"data analyst" OR "ml"'"""
+    print(f"\n[+] Searching: {query} ({start_year}-{end_year})")
 
-        if not data.get("success"):
-            print("   API ERROR:", data)
-            break
+    year_filter = " OR ".join([str(y) for y in range(start_year, end_year + 1)])
+    fq = f'({query}) AND ({year_filter})'
 
-        results = data["result"]["results"]
-        count = data["result"]["count"]
+    # Page đầu → biết tổng count
+    data = fetch_page(fq, 0)
+    if data is None:
+        return []
 
-        if not results:
-            break
+    all_results = list(data["result"]["results"])
+    count = data["result"]["count"]
 
-        all_results.extend(results)
-        print(f"   + {len(results)} rows (total: {len(all_results)}/{count})")
+    if not all_results:
+        return all_results
 
-        if start + ROWS_PER_PAGE >= count:
-            break
+    print(f"   + {len(all_results)} rows (total: {len(all_results)}/{count})")
 
-        start += ROWS_PER_PAGE
-        time.sleep(0.5)
+    # Các page còn lại đã biết offset → fetch song song, ghép lại theo thứ tự start
+    starts = range(ROWS_PER_PAGE, count, ROWS_PER_PAGE)
+    with ThreadPoolExecutor(max_workers=PAGE_WORKERS) as executor:
+        for data in executor.map(lambda start: fetch_page(fq, start), starts):
+            if data is None:
+                break
+
+            results = data["result"]["results"]
+            if not results:
+                break
+
+            all_results.extend(results)
+            print(f"   + {len(results)} rows (total: {len(all_results)}/{count})")
 
     return all_results
 
@@ -104,24 +202,55 @@ def search_keyword(keyword: str, start_year=2020, end_year=2025):
 # ==================================================================
 # 4. EXTRACT FIELDS
 # ==================================================================
+# Schema output cố định (= key của extract_fields + search_keyword, đúng thứ tự cột)
+# → Arrow không phải suy kiểu từng cột, count dùng int32 thay vì int64
+CANADA_SCHEMA = pa.schema([
+    ("dataset_id", pa.string()),
+    ("title", pa.string()),
+    ("organization", pa.string()),
+    ("notes", pa.string()),
+    ("keywords", pa.string()),
+    ("publish_date", pa.string()),
+    ("last_update", pa.timestamp("us")),
+    ("num_resources", pa.int32()),
+    ("num_raw_files", pa.int32()),
+    ("raw_urls", pa.string()),
+    ("portal_url", pa.string()),
+    ("search_keyword", pa.string()),
+])
+FIELD_NAMES = CANADA_SCHEMA.names
+
+
+RAW_FORMATS = frozenset({"CSV", "XLSX", "XLS", "JSON", "GEOJSON"})
+
+
+def tag_name(tag):
+    # CKAN trả tag dạng dict {"display_name": ..., "name": ...}
+    if isinstance(tag, dict):
+        return tag.get("display_name") or tag.get("name") or ""
+    return str(tag)
+
+
 def extract_fields(dataset: dict):
-    resources = dataset.get("resources", [])
-    raw_resources = [
-        r for r in resources if r.get("format", "").upper()
-        in ["CSV", "XLSX", "XLS", "JSON", "GEOJSON"]
+    resources = dataset.get("resources") or []
+
+    # 1 vòng duy nhất: lọc file raw + gom URL
+    raw_urls = [
+        r.get("url", "") for r in resources
+        if (r.get("format") or "").upper() in RAW_FORMATS
     ]
 
     return {
         "dataset_id": dataset.get("id"),
         "title": dataset.get("title", ""),
-        "organization": dataset.get("organization", {}).get("title", ""),
-        "notes": dataset.get("notes", "")[:500],
-        "keywords": ", ".join(dataset.get("tags", [])),
+        "organization": (dataset.get("organization") or {}).get("title", ""),
+        "notes": (dataset.get("notes") or "")[:500],
+        "keywords": ", ".join(tag_name(t) for t in dataset.get("tags") or ()),
         "publish_date": dataset.get("metadata_created"),
         "last_update": dataset.get("metadata_modified"),
         "num_resources": len(resources),
-        "num_raw_files": len(raw_resources),
-        "raw_urls": " | ".join([r.get("url", "") for r in raw_resources]),
+        "num_raw_files": len(raw_urls),
+        "raw_urls": " | ".join(raw_urls),
         "portal_url": f"https://open.canada.ca/data/en/dataset/{dataset.get('id')}"
     }
 
@@ -129,33 +258,50 @@ def extract_fields(dataset: dict):
 # ==================================================================
 # 5. RUN CRAWLING
 # ==================================================================
+def match_keywords(dataset: dict):
+    text = " ".join((
+        dataset.get("title") or "",
+        dataset.get("notes") or "",
+        " ".join(tag_name(t) for t in dataset.get("tags") or ()),
+    ))
+    return {KEYWORD_BY_LOWER[m.group(0).lower()] for m in KEYWORD_RE.finditer(text)}
+
+
 def run_crawler():
-    final_records = []
-    all_raw_json = []
+    # Gom theo cột (dict of lists) → pd.DataFrame không phải pivot list[dict]
+    columns = {name: [] for name in FIELD_NAMES}
 
-    for kw in KEYWORDS:
-        datasets = search_keyword(kw.replace(" ", "+"))
+    # 1 query OR cho mọi keyword → mỗi dataset chỉ về 1 lần (vẫn check id phòng page bị lệch)
+    datasets = search_keyword(KEYWORD_QUERY)
+    seen = set()
 
-        for ds in datasets:
-            rec = extract_fields(ds)
-            rec["search_keyword"] = kw
-            final_records.append(rec)
-            all_raw_json.append(rec)
+    for ds in datasets:
+        dataset_id = ds.get("id")
+        if dataset_id in seen:
+            continue
+        seen.add(dataset_id)
 
-        time.sleep(1)
+        rec = extract_fields(ds)
+        rec["search_keyword"] = ", ".join(sorted(match_keywords(ds)))
+        for name in FIELD_NAMES:
+            columns[name].append(rec[name])
 
-    return final_records, all_raw_json
+    return columns
 
 
 # ==================================================================
-# 6. SAVE RAW JSON
+# 6. SAVE RAW NDJSON
 # ==================================================================
-def save_raw(all_raw_json):
-    raw_json_file = RAW_DIR / "all_raw_results.json"
-    with open(raw_json_file, "w", encoding="utf-8") as f:
-        json.dump(all_raw_json, f, ensure_ascii=False, indent=2)
+def save_raw(columns):
+    # NDJSON: ghi từng record 1 dòng → không dựng cả chuỗi JSON lớn trong RAM
+    # (record dựng lại từ các cột, không giữ thêm 1 list record song song)
+    raw_json_file = RAW_DIR / "all_raw_results.ndjson"
+    with open(raw_json_file, "wb") as f:
+        for row in zip(*(columns[name] for name in FIELD_NAMES)):
+            f.write(orjson.dumps(dict(zip(FIELD_NAMES, row)), option=orjson.OPT_NON_STR_KEYS))
+            f.write(b"\n")
 
-    print(f"\n✔ Saved RAW JSON → {raw_json_file}")
+    print(f"\n✔ Saved RAW NDJSON → {raw_json_file}")
 
 
 # ==================================================================
@@ -184,25 +330,37 @@ def save_metadata(total_records):
     }
 
     meta_file = META_DIR / "canada_government_metadata.json"
-    with open(meta_file, "w", encoding="utf-8") as f:
-        json.dump(metadata, f, indent=2, ensure_ascii=False)
+    meta_file.write_bytes(orjson.dumps(metadata, option=orjson.OPT_INDENT_2))
 
     print(f"✔ Saved metadata → {meta_file}")
 
 
 # ==================================================================
-# 8. FLATTEN CSV
+# 8. SAVE OUTPUT (Parquet + CSV)
 # ==================================================================
-def save_csv(final_records):
-    df = pd.DataFrame(final_records)
-    df["last_update"] = pd.to_datetime(df["last_update"], errors="coerce")
-    df = df.sort_values("last_update", ascending=False)
+def save_csv(columns):
+    # Dựng thẳng Arrow table từ dict of lists — không qua pandas DataFrame
+    columns = dict(columns)
+    # CKAN trả ISO8601 (có/không phần giây lẻ) → parse fast path, không suy đoán format từ dòng đầu
+    columns["last_update"] = pa.array(
+        pd.to_datetime(pd.Series(columns["last_update"], dtype=object), format="ISO8601", errors="coerce")
+    )
+
+    table = pa.Table.from_pydict({name: columns[name] for name in FIELD_NAMES}, schema=CANADA_SCHEMA)
+    table = table.sort_by([("last_update", "descending")])
+
+    # 1 Arrow table dùng chung cho cả Parquet và CSV (writer C++ đa luồng)
+    pq.write_table(table, parquet_file, compression="zstd")
+    print(f"\n✔ Saved Parquet → {parquet_file}")
 
-    df.to_csv(csv_file, index=False, encoding="utf-8-sig")
+    if WRITE_CSV:
+        with open(csv_file, "wb") as f:
+            f.write("\ufeff".encode("utf-8"))  # BOM giống utf-8-sig để Excel đọc đúng tiếng Việt / tiếng Pháp
+            pa_csv.write_csv(table, f)
+        print(f"✔ Saved CSV → {csv_file}")
 
-    print(f"\n✔ Saved CSV → {csv_file}")
-    print(f"✔ Total records: {len(df)}")
-    print(f"✔ Total raw files found: {df['num_raw_files'].sum()}")
+    print(f"✔ Total records: {table.num_rows}")
+    print(f"✔ Total raw files found: {pc.sum(table['num_raw_files']).as_py() or 0}")
 
 
 # ==================================================================
@@ -211,11 +369,11 @@ def save_csv(final_records):
 def run_canada_datajobs_crawler():
     print("\n🚀 RUNNING CANADA CRAWLER...\n")
 
-    final_records, all_raw_json = run_crawler()
+    columns = run_crawler()
 
-    save_raw(all_raw_json)
-    save_metadata(len(final_records))
-    save_csv(final_records)
+    save_raw(columns)
+    save_metadata(len(columns["dataset_id"]))
+    save_csv(columns)
 
     print("\n🎉 CANADA PIPELINE DONE — DATA READY.\n")
 
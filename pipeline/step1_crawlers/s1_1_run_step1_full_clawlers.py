@@ -7,7 +7,9 @@ STEP 1.1 – RUN CRAWLERS FOR DATA JOBS SOURCES
 
 from pathlib import Path
 import pandas as pd
+import csv
 import sys
+from concurrent.futures import ThreadPoolExecutor
 
 # =====================================================
 # FIX IMPORT PATH (KHÔNG DÙNG python -m)
@@ -91,37 +93,54 @@ def run_all_crawlers(data_dir: Path):
 # =====================================================
 # CSV AUDIT UTILITIES (CHỈ FILE CRAWLER)
 # =====================================================
+COUNT_CHUNK_SIZE = 4 * 1024 * 1024  # 4 MB / lần đọc
+
 def count_csv_rows(path: Path) -> int:
     """Count rows in CSV (excluding header)"""
-    with open(path, "r", encoding="utf-8", errors="ignore") as f:
-        return sum(1 for _ in f) - 1
+    # Đếm b"\n" theo block nhị phân (bytes.count chạy trong C), không decode + lặp từng dòng
+    n_lines = 0
+    last = b""
+    with open(path, "rb") as f:
+        while chunk := f.read(COUNT_CHUNK_SIZE):
+            n_lines += chunk.count(b"\n")
+            last = chunk[-1:]
+    if last and last != b"\n":
+        n_lines += 1  # dòng cuối không có newline
+    return n_lines - 1
+
+
+def count_csv_columns(path: Path) -> int:
+    # Chỉ parse dòng header, không cho pandas dựng DataFrame
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        return len(next(csv.reader(f)))
+
+
+def _audit_one(csv_file: Path) -> dict:
+    try:
+        return {
+            "file_name": csv_file.name,
+            "row_count": count_csv_rows(csv_file),
+            "column_count": count_csv_columns(csv_file)
+        }
+    except Exception:
+        return {
+            "file_name": csv_file.name,
+            "row_count": None,
+            "column_count": None
+        }
 
 
 def audit_csv_basic(data_dir: Path):
     print("\n📊 Auditing crawler CSV files...\n")
 
-    records = []
     CRAWLED_FILES = set(CRAWLER_REGISTRY.keys())
+    csv_files = [p for p in data_dir.glob("*.csv") if p.name in CRAWLED_FILES]  # bỏ qua external files
 
-    for csv_file in data_dir.glob("*.csv"):
-        if csv_file.name not in CRAWLED_FILES:
-            continue  # bỏ qua external files
+    # Mỗi file độc lập, việc chính là đọc disk -> thread là đủ (process phải import lại toàn bộ crawler)
+    with ThreadPoolExecutor(max_workers=max(len(csv_files), 1)) as ex:
+        records = list(ex.map(_audit_one, csv_files))
 
-        try:
-            df_head = pd.read_csv(csv_file, nrows=0)
-            records.append({
-                "file_name": csv_file.name,
-                "row_count": count_csv_rows(csv_file),
-                "column_count": len(df_head.columns)
-            })
-        except Exception:
-            records.append({
-                "file_name": csv_file.name,
-                "row_count": None,
-                "column_count": None
-            })
-
-    df = pd.DataFrame(records)
+    df = pd.DataFrame(records, columns=["file_name", "row_count", "column_count"])
 
     df["row_count"] = pd.to_numeric(df["row_count"], errors="coerce")
     df["column_count"] = pd.to_numeric(df["column_count"], errors="coerce")
@@ -3,7 +3,7 @@
 STEP 1.5 – INGEST HUGGINGFACE DATASET (data_jobs)
 
 Purpose:
-- Load HuggingFace datasets
+- Load HuggingFace datasets (cache local Parquet, chạy lại không cần load_dataset)
 - Export raw datasets to CSV
 - Treat as extracted source (NO cleaning, NO normalization)
 
@@ -13,7 +13,9 @@ IMPORTANT:
 
 from datasets import load_dataset
 from pathlib import Path
-import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
 
 # =====================================================
 # PATHS
@@ -25,6 +27,10 @@ OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
 HF_DATA_JOBS_CSV = OUTPUT_DIR / "hf_data_jobs_2023-2025.csv"
 
+# Bản Arrow gốc của dataset, lưu Parquet 1 lần -> các lần chạy sau đọc thẳng file này
+HF_CACHE_DIR = BASE_DIR / "data" / "data_raw" / "huggingface"
+HF_DATA_JOBS_PARQUET = HF_CACHE_DIR / "hf_data_jobs_2023-2025.parquet"
+
 # File này ít row với bị trùng với file 1 nên ko xài
 # HF_AI_JOBS_CSV = OUTPUT_DIR / "extracted_hf_2025_ai_jobs.csv"
 
@@ -44,13 +50,29 @@ def confirm_overwrite(path: Path, force: bool = False) -> bool:
     return ans == "y"
 
 
-def save_csv_safe(df: pd.DataFrame, path: Path, force: bool = False):
+def load_hf_table(repo_id: str, cache_path: Path) -> pa.Table:
+    if not cache_path.exists():
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        load_dataset(repo_id, split="train").to_parquet(str(cache_path))
+        print(f"✓ Cached: {cache_path.name}")
+    else:
+        print(f"⏭ Using cached Parquet: {cache_path.name}")
+    return pq.read_table(cache_path)
+
+
+def save_csv_safe(table: pa.Table, path: Path, force: bool = False):
     if not confirm_overwrite(path, force=force):
         print(f"⏭ Skipped: {path.name}")
         return False
 
-    df.to_csv(path, index=False, encoding="utf-8-sig")
-    print(f"✓ Saved: {path.name} ({len(df):,} rows)")
+    if any(pa.types.is_nested(field.type) for field in table.schema):
+        # pyarrow CSV writer không ghi được cột list/struct -> để pandas stringify như cũ
+        table.to_pandas().to_csv(path, index=False, encoding="utf-8-sig")
+    else:
+        with open(path, "wb") as f:
+            f.write("\ufeff".encode("utf-8"))  # BOM giống utf-8-sig
+            pa_csv.write_csv(table, f)
+    print(f"✓ Saved: {path.name} ({table.num_rows:,} rows)")
     return True
 
 
@@ -62,12 +84,8 @@ def run_huggingface_ingest(force: bool = False):
     print("\n🚀 STEP 1.5 – HuggingFace ingestion\n")
 
     # Dataset 1: General Data Jobs
-    dataset_jobs = load_dataset(
-        "lukebarousse/data_jobs",
-        split="train"
-    )
-    df_jobs = dataset_jobs.to_pandas()
-    save_csv_safe(df_jobs, HF_DATA_JOBS_CSV, force=force)
+    table_jobs = load_hf_table("lukebarousse/data_jobs", HF_DATA_JOBS_PARQUET)
+    save_csv_safe(table_jobs, HF_DATA_JOBS_CSV, force=force)
 
     # # Dataset 2: 2025 AI / Data Jobs
     # dataset_ai_jobs = load_dataset(
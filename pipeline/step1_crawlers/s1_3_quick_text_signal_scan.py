@@ -19,7 +19,9 @@ REFERENCE (schema-fixed):
 """
 
 import pandas as pd
+import os
 import re
+import pickle
 from pathlib import Path
 
 # ==================================================
@@ -49,37 +51,93 @@ def load_keywords_column(csv_path: Path, col: str) -> set:
                 keywords.add(k)
     return keywords
 
-# ---- Load mappings (EXACT columns) ----
-
-COUNTRY_KEYS = load_simple_column(
-    REF_DIR / "countries.csv",
-    "country_name"
-)
-
-CITY_KEYS = load_simple_column(
-    REF_DIR / "cities.csv",
-    "city_name"
-)
-
-EMPLOYMENT_KEYS = load_keywords_column(
-    REF_DIR / "employment_type_mapping.csv",
-    "keywords"
-)
-
-EDUCATION_KEYS = load_keywords_column(
-    REF_DIR / "education_level_mapping.csv",
-    "keywords"
-)
+def load_role_keys(csv_path: Path) -> set:
+    role_df = pd.read_csv(csv_path)
+    keywords = set()
+    for col in ["canonical_role", "keywords", "aliases", "strong_terms"]:
+        for val in role_df[col].dropna():
+            for k in str(val).lower().split("|"):
+                k = k.strip()
+                if k:
+                    keywords.add(k)
+    return keywords
 
-ROLE_KEYS = set()
+# ==================================================
+# KEYWORD MATCHERS (1 regex dạng trie / keyword set)
+# ==================================================
+# `any(k in text for k in keys)` = |keys| lần quét text / row (cities ~190k key).
+# Gộp keys thành 1 regex dạng trie (các key chung prefix dùng chung nhánh) -> mỗi vị trí
+# trong text chỉ đi 1 đường trên trie. Kết quả y hệt substring match, không cần word boundary.
+
+def _trie_pattern(node: dict) -> str:
+    if "" in node and len(node) == 1:
+        return ""
+    alts, single_chars = [], []
+    for ch in sorted(k for k in node if k):
+        sub = _trie_pattern(node[ch])
+        if sub:
+            alts.append(re.escape(ch) + sub)
+        else:
+            single_chars.append(re.escape(ch))
+    if len(single_chars) == 1:
+        alts.append(single_chars[0])
+    elif single_chars:
+        alts.append("[" + "".join(single_chars) + "]")
+    pattern = alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+    if "" in node:  # key kết thúc tại đây nhưng còn key dài hơn
+        pattern = "(?:" + pattern + ")?"
+    return pattern
+
+def keyword_pattern(keywords: set) -> str:
+    if not keywords:
+        return r"(?!)"  # không match gì
+    trie = {}
+    for k in keywords:
+        node = trie
+        for ch in k:
+            node = node.setdefault(ch, {})
+        node[""] = True
+    return _trie_pattern(trie)
 
-_role_df = pd.read_csv(REF_DIR / "role_names_mapping.csv")
-for col in ["canonical_role", "keywords", "aliases", "strong_terms"]:
-    for val in _role_df[col].dropna():
-        for k in str(val).lower().split("|"):
-            k = k.strip()
-            if k:
-                ROLE_KEYS.add(k)
+# ---- Load mappings (EXACT columns) ----
+# name -> (reference file, loader)
+KEYWORD_SOURCES = {
+    "country": (REF_DIR / "countries.csv", lambda p: load_simple_column(p, "country_name")),
+    "city": (REF_DIR / "cities.csv", lambda p: load_simple_column(p, "city_name")),
+    "employment_type": (REF_DIR / "employment_type_mapping.csv", lambda p: load_keywords_column(p, "keywords")),
+    "education_level": (REF_DIR / "education_level_mapping.csv", lambda p: load_keywords_column(p, "keywords")),
+    "role_name": (REF_DIR / "role_names_mapping.csv", load_role_keys),
+}
+
+# Pattern đã build được cache lại (cities.csv ~12MB -> đọc + dựng trie mất vài giây mỗi lần chạy).
+# Cache tự mất hiệu lực khi 1 file reference thay đổi (so mtime).
+KEYWORD_CACHE_PATH = REF_DIR / "_keyword_regex_cache.pkl"
+
+def load_keyword_patterns() -> dict:
+    mtimes = {name: path.stat().st_mtime_ns for name, (path, _) in KEYWORD_SOURCES.items()}
+    try:
+        with open(KEYWORD_CACHE_PATH, "rb") as f:
+            cache = pickle.load(f)
+        if cache["mtimes"] == mtimes:
+            return cache["patterns"]
+    except (OSError, EOFError, KeyError, TypeError, pickle.UnpicklingError):
+        pass
+
+    patterns = {name: keyword_pattern(loader(path)) for name, (path, loader) in KEYWORD_SOURCES.items()}
+    try:
+        with open(KEYWORD_CACHE_PATH, "wb") as f:
+            pickle.dump({"mtimes": mtimes, "patterns": patterns}, f, protocol=pickle.HIGHEST_PROTOCOL)
+    except OSError:
+        pass  # không ghi được cache thì thôi, lần sau build lại
+    return patterns
+
+_KEYWORD_PATTERNS = load_keyword_patterns()
+
+EMPLOYMENT_RE = re.compile(_KEYWORD_PATTERNS["employment_type"])
+EDUCATION_RE = re.compile(_KEYWORD_PATTERNS["education_level"])
+ROLE_RE = re.compile(_KEYWORD_PATTERNS["role_name"])
+COUNTRY_RE = re.compile(_KEYWORD_PATTERNS["country"])
+CITY_RE = re.compile(_KEYWORD_PATTERNS["city"])
 
 # ==================================================
 # REGEX – REMOTE & SALARY
@@ -105,18 +163,21 @@ SALARY_CONTEXT_REGEX = re.compile(
     re.I
 )
 
-def has_salary(text: str) -> bool:
-    return bool(
-        CURRENCY_REGEX.search(text)
-        and (SALARY_NUMBER_REGEX.search(text) or SALARY_CONTEXT_REGEX.search(text))
+def salary_mask_of(text_series: pd.Series) -> pd.Series:
+    # currency AND (number OR salary context) — mỗi regex chạy 1 lần trên cả Series
+    return (
+        text_series.str.contains(CURRENCY_REGEX)
+        & (text_series.str.contains(SALARY_NUMBER_REGEX) | text_series.str.contains(SALARY_CONTEXT_REGEX))
     )
 
 # ==================================================
 # SIGNAL CHECK
 # ==================================================
 
-def has_any(text: str, keywords: set) -> bool:
-    return any(k in text for k in keywords)
+def row_text(chunk: pd.DataFrame) -> pd.Series:
+    # Nối cột theo kiểu vectorized (str.cat), không join từng row bằng Python
+    cols = [chunk[c].astype(str) for c in chunk.columns]
+    return cols[0].str.cat(cols[1:], sep=" ", na_rep="").str.lower()
 
 def scan_file(file_path: Path, chunk_size: int = 10_000):
     print(f"\n📄 FILE: {file_path.name}")
@@ -135,21 +196,22 @@ def scan_file(file_path: Path, chunk_size: int = 10_000):
 
     chunk_idx = 0
 
-    for chunk in pd.read_csv(file_path, chunksize=chunk_size):
+    # Scan chỉ cần text: đọc thẳng str (bỏ suy luận dtype) và không dò NA (ô trống -> "")
+    for chunk in pd.read_csv(file_path, chunksize=chunk_size, dtype=str, na_filter=False):
         chunk_idx += 1
         chunk_rows = len(chunk)
         total_rows += chunk_rows
 
         # gộp text từng row
-        text_series = chunk.astype(str).agg(" ".join, axis=1).str.lower()
+        text_series = row_text(chunk)
 
-        salary_mask = text_series.apply(has_salary)
+        salary_mask = salary_mask_of(text_series)
         remote_mask = text_series.str.contains(REMOTE_REGEX)
-        employment_mask = text_series.apply(lambda x: has_any(x, EMPLOYMENT_KEYS))
-        education_mask = text_series.apply(lambda x: has_any(x, EDUCATION_KEYS))
-        role_mask = text_series.apply(lambda x: has_any(x, ROLE_KEYS))
-        country_mask = text_series.apply(lambda x: has_any(x, COUNTRY_KEYS))
-        city_mask = text_series.apply(lambda x: has_any(x, CITY_KEYS))
+        employment_mask = text_series.str.contains(EMPLOYMENT_RE)
+        education_mask = text_series.str.contains(EDUCATION_RE)
+        role_mask = text_series.str.contains(ROLE_RE)
+        country_mask = text_series.str.contains(COUNTRY_RE)
+        city_mask = text_series.str.contains(CITY_RE)
 
         counters["salary"] += salary_mask.sum()
         counters["remote_option"] += remote_mask.sum()
@@ -203,11 +265,14 @@ def scan_file(file_path: Path, chunk_size: int = 10_000):
 # ==================================================
 
 def run():
-    files = sorted(
-        DATA_DIR.glob("*.csv"),
-        key=lambda p: p.stat().st_mtime,
-        reverse=True
-    )
+    # os.scandir: DirEntry giữ sẵn kết quả stat, không tạo Path cho từng entry chỉ để sort
+    with os.scandir(DATA_DIR) as it:
+        entries = sorted(
+            (e for e in it if e.name.endswith(".csv") and e.is_file()),
+            key=lambda e: e.stat().st_mtime,
+            reverse=True
+        )
+    files = [Path(e.path) for e in entries]
 
     print("===================================")
     print("STEP 1.4 – QUICK TEXT SIGNAL SCAN")
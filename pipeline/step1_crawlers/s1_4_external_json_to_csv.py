@@ -14,10 +14,11 @@ IMPORTANT RULES:
 4. Missing value → "__NA__"
 """
 
+import csv
 import json
 import re
-import pandas as pd
 import ijson
+import orjson
 from pathlib import Path
 
 # ==================================================
@@ -30,6 +31,37 @@ INPUT_DIR = BASE_DIR / "data" / "data_raw" / "external"
 OUTPUT_DIR = BASE_DIR / "data" / "data_processing" / "s1_data_extracted"
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
+NA_VALUE = "__NA__"
+WRITE_BUFFER_SIZE = 1 << 20  # 1 MB
+
+# ==================================================
+# CSV WRITER (mở file 1 lần, ghi thẳng từng batch — không dựng DataFrame mỗi batch)
+# ==================================================
+
+def collect_fieldnames(items) -> list:
+    """
+    Pass 1 (chỉ lấy key, không ghi gì): hợp key của MỌI row, giữ thứ tự xuất hiện
+    → header đầy đủ, key chỉ xuất hiện ở cuối file cũng không bị mất.
+    """
+    fieldnames = {}
+    for item in items:
+        fieldnames.update(dict.fromkeys(item))
+    return list(fieldnames)
+
+def open_csv_writer(output_path: Path, fieldnames: list):
+    """Mở output 1 lần cho cả file. Key thiếu ở 1 row → NA_VALUE."""
+    out_f = open(output_path, "w", encoding="utf-8-sig", newline="", buffering=WRITE_BUFFER_SIZE)
+    # extrasaction="ignore": chỉ còn tác dụng khi TRY 2 ghi tiếp vào file đã mở theo header của TRY 1
+    writer = csv.DictWriter(out_f, fieldnames=fieldnames, restval=NA_VALUE, extrasaction="ignore")
+    writer.writeheader()
+    return out_f, writer
+
+def write_rows(writer: csv.DictWriter, rows: list):
+    writer.writerows(
+        {k: NA_VALUE if v is None else v for k, v in row.items()}
+        for row in rows
+    )
+
 # ==================================================
 # CORE
 # ==================================================
@@ -43,6 +75,39 @@ def sanitize_mongo_json_line(line: str) -> str:
     line = re.sub(r'ObjectId\("([^"]+)"\)', r'"\1"', line)
     return line.strip()
 
+def dump_nested(value) -> str:
+    """dict/list → JSON string (UTF-8 giữ nguyên). ijson trả số thực dạng Decimal → default=float."""
+    return orjson.dumps(value, default=float, option=orjson.OPT_NON_STR_KEYS).decode()
+
+def flatten_row(item: dict) -> dict:
+    return {k: dump_nested(v) if isinstance(v, (dict, list)) else v for k, v in item.items()}
+
+def iter_json_array(file_path: Path):
+    """TRY 1: file là 1 JSON array → yield từng object (stream bằng ijson)"""
+    with open(file_path, "rb") as f:
+        for item in ijson.items(f, "item"):
+            if isinstance(item, dict):
+                yield item
+
+def iter_json_lines(file_path: Path):
+    """TRY 2: JSON lines / Mongo shell dump → yield từng object, bỏ dòng không parse được"""
+    with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
+        for line in f:
+            line = sanitize_mongo_json_line(line)
+            if not line:
+                continue
+            try:
+                item = orjson.loads(line)
+            except orjson.JSONDecodeError:
+                # orjson không nhận NaN / Infinity (có trong Mongo shell dump) → thử lại bằng json
+                try:
+                    item = json.loads(line)
+                except ValueError:
+                    continue
+
+            if isinstance(item, dict):
+                yield item
+
 def process_json_file(file_path: Path, chunk_size: int = 10_000):
     print(f"▶ Processing: {file_path.name}")
 
@@ -50,40 +115,37 @@ def process_json_file(file_path: Path, chunk_size: int = 10_000):
     buffer = []
     batch_index = 0
     total_rows = 0
+    out_f = writer = None
+    fieldnames = []
 
     def flush_buffer():
-        nonlocal buffer, batch_index, total_rows
+        nonlocal out_f, writer, batch_index, total_rows
         if not buffer:
             return
-        df = pd.DataFrame(buffer).fillna("__NA__")
-        df.to_csv(
-            output_path,
-            mode="w" if batch_index == 0 else "a",
-            header=(batch_index == 0),
-            index=False,
-            encoding="utf-8-sig"
-        )
-        total_rows += len(df)
+        if writer is None:
+            out_f, writer = open_csv_writer(output_path, fieldnames)
+        write_rows(writer, buffer)
+        total_rows += len(buffer)
         batch_index += 1
         buffer.clear()
         print(f"  ✓ Batch {batch_index} written ({total_rows} rows)")
 
+    def close_output():
+        nonlocal out_f, writer
+        if out_f is not None:
+            out_f.close()
+        out_f = writer = None
+
     try:
         # =========================
         # TRY 1: JSON ARRAY STREAM
         # =========================
         try:
-            with open(file_path, "rb") as f:
-                for item in ijson.items(f, "item"):
-                    if not isinstance(item, dict):
-                        continue
-                    row = {
-                        k: json.dumps(v, ensure_ascii=False) if isinstance(v, (dict, list)) else v
-                        for k, v in item.items()
-                    }
-                    buffer.append(row)
-                    if len(buffer) >= chunk_size:
-                        flush_buffer()
+            fieldnames = collect_fieldnames(iter_json_array(file_path))
+            for item in iter_json_array(file_path):
+                buffer.append(flatten_row(item))
+                if len(buffer) >= chunk_size:
+                    flush_buffer()
             flush_buffer()
             if total_rows == 0:
                 print("⚠️  No rows parsed as JSON → fallback to TSV")
@@ -93,6 +155,7 @@ def process_json_file(file_path: Path, chunk_size: int = 10_000):
             print(f"✓ DONE (json-lines): {output_path.name} → {total_rows} rows")
 
         except Exception:
+            close_output()  # TRY 2 ghi lại file từ đầu
             buffer.clear()
             batch_index = 0
             total_rows = 0
@@ -100,33 +163,20 @@ def process_json_file(file_path: Path, chunk_size: int = 10_000):
         # =========================
         # TRY 2: JSON LINES / MONGO
         # =========================
-        with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-            for line in f:
-                line = sanitize_mongo_json_line(line)
-                if not line:
-                    continue
-                try:
-                    item = json.loads(line)
-                except Exception:
-                    continue
-
-                if not isinstance(item, dict):
-                    continue
-
-                row = {
-                    k: json.dumps(v, ensure_ascii=False) if isinstance(v, (dict, list)) else v
-                    for k, v in item.items()
-                }
-                buffer.append(row)
-
-                if len(buffer) >= chunk_size:
-                    flush_buffer()
+        if writer is None:  # file chưa mở theo header của TRY 1 → header theo JSON lines
+            fieldnames = collect_fieldnames(iter_json_lines(file_path))
+        for item in iter_json_lines(file_path):
+            buffer.append(flatten_row(item))
+            if len(buffer) >= chunk_size:
+                flush_buffer()
 
         flush_buffer()
         print(f"✓ DONE (json-lines): {output_path.name} → {total_rows} rows")
 
     except Exception as e:
         print(f"❌ ERROR processing {file_path.name}: {e}")
+    finally:
+        close_output()
 
 def parse_tsv_fallback(file_path: Path, chunk_size: int = 10_000):
     print("⚠️  Fallback to TSV mode")
@@ -135,42 +185,46 @@ def parse_tsv_fallback(file_path: Path, chunk_size: int = 10_000):
     batch_index = 0
     total_rows = 0
     buffer = []
+    out_f = writer = None
 
+    # Pass 1: số cột lớn nhất trong file → header col_1..col_N đủ cho mọi dòng
+    n_cols = 0
     with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
         for line in f:
             line = line.rstrip("\n")
-            if not line:
-                continue
+            if line:
+                n_cols = max(n_cols, line.count("\t") + 1)
+    fieldnames = [f"col_{i+1}" for i in range(n_cols)]
+
+    try:
+        with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
+            for line in f:
+                line = line.rstrip("\n")
+                if not line:
+                    continue
 
-            parts = line.split("\t")
+                parts = line.split("\t")
 
-            row = {f"col_{i+1}": v if v else "__NA__" for i, v in enumerate(parts)}
-            buffer.append(row)
+                row = {f"col_{i+1}": v if v else NA_VALUE for i, v in enumerate(parts)}
+                buffer.append(row)
 
-            if len(buffer) >= chunk_size:
-                df = pd.DataFrame(buffer).fillna("__NA__")
-                df.to_csv(
-                    output_path,
-                    mode="w" if batch_index == 0 else "a",
-                    header=(batch_index == 0),
-                    index=False,
-                    encoding="utf-8-sig"
-                )
-                total_rows += len(df)
-                batch_index += 1
-                buffer.clear()
-                print(f"  ✓ TSV batch {batch_index} ({total_rows} rows)")
-
-    if buffer:
-        df = pd.DataFrame(buffer).fillna("__NA__")
-        df.to_csv(
-            output_path,
-            mode="w" if batch_index == 0 else "a",
-            header=(batch_index == 0),
-            index=False,
-            encoding="utf-8-sig"
-        )
-        total_rows += len(df)
+                if len(buffer) >= chunk_size:
+                    if writer is None:
+                        out_f, writer = open_csv_writer(output_path, fieldnames)
+                    write_rows(writer, buffer)
+                    total_rows += len(buffer)
+                    batch_index += 1
+                    buffer.clear()
+                    print(f"  ✓ TSV batch {batch_index} ({total_rows} rows)")
+
+        if buffer:
+            if writer is None:
+                out_f, writer = open_csv_writer(output_path, fieldnames)
+            write_rows(writer, buffer)
+            total_rows += len(buffer)
+    finally:
+        if out_f is not None:
+            out_f.close()
 
     print(f"✓ DONE (TSV): {output_path.name} → {total_rows} rows")
 
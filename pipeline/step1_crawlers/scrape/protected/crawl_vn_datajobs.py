@@ -2,11 +2,12 @@
 # -*- coding: utf-8 -*-
 """
 crawl_vn_full_requests_only.py
-Single-file crawler (requests + BeautifulSoup) for VN job sites (stable ones only)
+Single-file crawler (requests + lxml) for VN job sites (stable ones only)
 Crawls: Joboko, JobsGO, TimViecNhanh, MyWork, Vieclam24h, CareerLink, ChoTot (API)
 Outputs:
   ./output/<source>_jobs.csv
   ./output/merged_vn_jobs_full.csv
+  ./output/jobs_parquet/source=<source>/   (Parquet dataset, đọc gộp: pd.read_parquet("output/jobs_parquet"))
 Fields:
   source, job_id, title, company, location, city, country, posted_date, expired_date,
   min_salary, max_salary, currency, employment_type, seniority, description, skills, url, scraped_at
@@ -14,14 +15,27 @@ Fields:
 
 import re
 import time
+import unicodedata
+import hashlib
 import random
 import logging
-from datetime import datetime, timezone
+from datetime import datetime, timezone, timedelta
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from functools import lru_cache
+from itertools import islice
+from typing import List, Dict, Any, Optional, Iterable
+from concurrent.futures import ThreadPoolExecutor
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+from lxml import etree, html as lxml_html
+from lxml.cssselect import CSSSelector
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.compute as pc
+import pyarrow.dataset as pa_ds
 from dateutil import parser as dateparser
 from tqdm import tqdm
 
@@ -38,6 +52,9 @@ CONFIG = {
     "DELAY": (0.3, 1.0),
     "RETRY": 3,
     "TIMEOUT": 12,
+    "SOURCE_WORKERS": 7,   # 7 site khác host -> crawl song song, không chung rate limit
+    "DETAIL_WORKERS": 8,   # số detail page fetch song song trên mỗi listing page
+    "DETAIL_CACHE_TTL": 24 * 3600,  # giây; detail HTML cache trên disk, chạy lại trong ngày không tải lại
     "USER_AGENTS": [
         "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
         "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko)",
@@ -53,6 +70,27 @@ logger = logging.getLogger("vn_requests_crawler")
 
 # Ensure output dir
 Path(CONFIG["OUTPUT_DIR"]).mkdir(parents=True, exist_ok=True)
+DETAIL_CACHE_DIR = Path(CONFIG["OUTPUT_DIR"]) / ".http_cache"
+DETAIL_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+PARQUET_DATASET_DIR = Path(CONFIG["OUTPUT_DIR"]) / "jobs_parquet"
+
+# HTTP session: 1 connection pool (keep-alive) dùng chung cho listing + detail pages.
+# User-Agent vẫn random theo từng request qua headers().
+SESSION = requests.Session()
+_adapter = HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=CONFIG["DETAIL_WORKERS"],
+    # 429 / 5xx -> adapter tự retry với backoff (tôn trọng Retry-After)
+    max_retries=Retry(
+        total=CONFIG["RETRY"],
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=("GET",),
+        raise_on_status=False,
+    ),
+)
+SESSION.mount("http://", _adapter)
+SESSION.mount("https://", _adapter)
 
 # Canonical fields
 FIELDS = [
@@ -60,11 +98,36 @@ FIELDS = [
     "posted_date", "expired_date", "min_salary", "max_salary", "currency",
     "employment_type", "seniority", "description", "skills", "url", "scraped_at"
 ]
+# Schema cố định -> Arrow không phải suy đoán kiểu từ list[dict] (salary luôn int64, còn lại string)
+VN_SCHEMA = pa.schema([
+    (f, pa.int64() if f in ("min_salary", "max_salary") else pa.string()) for f in FIELDS
+])
+
+# ---------- Precompiled regex (chạy trên mọi card -> compile 1 lần) ----------
+_WS_RE = re.compile(r'\s+')
+_CUR_VND_RE = re.compile(r'\b(vnd|vnđ|đ|dong)\b')
+_CUR_USD_RE = re.compile(r'\b(us\$|\$|usd)\b')
+_NUMS_RE = re.compile(r'(\d{1,3}(?:[.,]\d{1,3})?)')
+_RANGE_RE = re.compile(r'(\d{1,3}(?:[.,]\d{1,3})?)\s*[-tođến–]\s*(\d{1,3}(?:[.,]\d{1,3})?)')
+_SINGLE_NUM_RE = re.compile(r'(\d+(?:[.,]\d+)?)')
+_SALARY_LABEL_RE = re.compile(r'lương|salary', re.I)
+# Ngày đăng: site VN gần như chỉ dùng dd/mm/yyyy, dd-mm-yyyy, yyyy-mm-dd hoặc "X ngày trước"
+_DMY_RE = re.compile(r'\b(\d{1,2})[/.-](\d{1,2})[/.-](\d{4})\b')
+_YMD_RE = re.compile(r'\b(\d{4})-(\d{1,2})-(\d{1,2})\b')
+_REL_DATE_RE = re.compile(r'(\d+)\s*(phút|giờ|ngày|tuần|tháng)\s*trước', re.I)
+_REL_UNITS = {"phút": timedelta(minutes=1), "giờ": timedelta(hours=1), "ngày": timedelta(days=1),
+              "tuần": timedelta(weeks=1), "tháng": timedelta(days=30)}
 
 # ---------- Utilities ----------
 def now_iso():
     return datetime.now(timezone.utc).isoformat()
 
+def make_job_id(prefix: str, href: Optional[str], page: int) -> str:
+    # hash() của Python bị random theo process -> job_id đổi mỗi lần chạy; blake2b thì ổn định
+    if href:
+        return f"{prefix}_{hashlib.blake2b(href.encode('utf-8'), digest_size=8).hexdigest()}"
+    return f"{prefix}_{page}_{random.randint(1,10**6)}"
+
 def rand_sleep():
     time.sleep(random.uniform(*CONFIG["DELAY"]))
 
@@ -74,7 +137,7 @@ def headers():
 def safe_get(url: str, params: dict = None, verify: bool = True) -> Optional[requests.Response]:
     for attempt in range(CONFIG["RETRY"]):
         try:
-            r = requests.get(url, params=params, headers=headers(), timeout=CONFIG["TIMEOUT"], verify=verify)
+            r = SESSION.get(url, params=params, headers=headers(), timeout=CONFIG["TIMEOUT"], verify=verify)
             if r.status_code == 200:
                 return r
             else:
@@ -91,25 +154,117 @@ def safe_get_text(url: str, params: dict = None, verify: bool = True) -> Optiona
     r = safe_get(url, params=params, verify=verify)
     return r.text if r is not None else None
 
+# ---------- HTML parsing (lxml + CSS selector compile 1 lần) ----------
+# Luôn parse từ bytes: lxml không nhận str có khai báo encoding (<?xml ... encoding=...?>)
+_HTML_PARSER = lxml_html.HTMLParser(encoding="utf-8")
+
+def parse_html(html: str):
+    try:
+        return lxml_html.fromstring(html.encode("utf-8"), parser=_HTML_PARSER)
+    except (etree.ParserError, ValueError) as e:
+        logger.debug("HTML parse error -> %s", e)
+        # document rỗng -> mọi select() trả [] và crawler dừng như khi không có card
+        return lxml_html.Element("html")
+
+@lru_cache(maxsize=None)
+def css(selector: str) -> CSSSelector:
+    return CSSSelector(selector)
+
+def select(node, selector: str) -> list:
+    return css(selector)(node)
+
+def select_one(node, selector: str):
+    # NOTE: lxml element không có con thì bool() = False -> luôn so sánh với None
+    found = css(selector)(node)
+    return found[0] if found else None
+
+def node_text(el, sep: str = "") -> str:
+    return sep.join(el.itertext())
+
+def find_text_parent(node, pattern):
+    """First element whose own text / tail text matches pattern (như soup.find(text=...).parent)."""
+    for t in node.xpath(".//text()"):
+        if pattern.search(t):
+            parent = t.getparent()
+            return parent.getparent() if t.is_tail else parent
+    return None
+
+# Khối lương thường nằm trong các class này; chỉ regex trên đó thay vì cả trang (ít false positive hơn)
+SALARY_SELECTOR = ".salary, .job-salary, .sal, .mucluong, [class*=salary], [class*=luong]"
+
+def salary_text(dtree) -> str:
+    els = select(dtree, SALARY_SELECTOR)
+    if els:
+        return " ".join(node_text(el, " ") for el in els)
+    return node_text(dtree, " ")  # không có khối lương -> quét cả trang như cũ
+
+def card_href(card, base: str, selector: str = "a") -> Optional[str]:
+    a = select_one(card, selector)
+    href = a.get("href") if a is not None else None
+    if href and href.startswith("/"):
+        href = base + href
+    return href
+
+def detail_cache_path(url: str) -> Path:
+    return DETAIL_CACHE_DIR / f"{hashlib.sha1(url.encode('utf-8')).hexdigest()}.html"
+
+def fetch_detail(url: str) -> Optional[str]:
+    """Detail page HTML, ưu tiên cache trên disk (hết hạn sau DETAIL_CACHE_TTL)."""
+    path = detail_cache_path(url)
+    try:
+        if time.time() - path.stat().st_mtime <= CONFIG["DETAIL_CACHE_TTL"]:
+            return path.read_text(encoding="utf-8")
+    except OSError:
+        pass
+    html = safe_get_text(url)
+    if html is not None:
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(html, encoding="utf-8")
+        tmp_path.replace(path)
+    return html
+
+def fetch_details(hrefs: Iterable[Optional[str]]) -> Dict[str, Optional[str]]:
+    """
+    Fetch all detail pages of one listing page concurrently (pure network I/O -> threads).
+    Returns {href: html or None}; duplicate hrefs are fetched once.
+    """
+    urls = list(dict.fromkeys(h for h in hrefs if h))
+    if not urls:
+        return {}
+    with ThreadPoolExecutor(max_workers=CONFIG["DETAIL_WORKERS"]) as ex:
+        return dict(zip(urls, ex.map(fetch_detail, urls)))
+
 def text_clean(s: Optional[str]) -> Optional[str]:
     if not s:
         return None
     # remove excess whitespace and newlines, keep plain text
-    txt = re.sub(r'\s+', ' ', s).strip()
+    txt = _WS_RE.sub(' ', s).strip()
     return txt if txt else None
 
-def guess_city(location: Optional[str], description: Optional[str]) -> Optional[str]:
-    if location:
-        txt = location.lower()
-        for city in COMMON_CITIES:
-            if city.lower() in txt:
-                return city
-    if description:
-        txt = description.lower()
-        for city in COMMON_CITIES:
-            if city.lower() in txt:
-                return city
-    return None
+def parse_date(text: Optional[str]) -> Optional[str]:
+    """
+    ISO date from a posted-date label. Regex fast path for the common VN formats
+    (dd/mm/yyyy is day-first), dateutil fuzzy parse only as last resort.
+    """
+    if not text:
+        return None
+    try:
+        m = _DMY_RE.search(text)
+        if m:
+            return datetime(int(m.group(3)), int(m.group(2)), int(m.group(1))).isoformat()
+        m = _YMD_RE.search(text)
+        if m:
+            return datetime(int(m.group(1)), int(m.group(2)), int(m.group(3))).isoformat()
+    except ValueError:
+        pass  # vd 31/02/2024 -> để dateutil thử
+    m = _REL_DATE_RE.search(text)
+    if m:
+        delta = _REL_UNITS[m.group(2).lower()] * int(m.group(1))
+        return (datetime.now(timezone.utc) - delta).isoformat()
+    try:
+        return dateparser.parse(text, fuzzy=True).isoformat()
+    except (ValueError, OverflowError):
+        return None
 
 def extract_salary(text: Optional[str]) -> (Optional[float], Optional[float], Optional[str]):
     """
@@ -119,38 +274,35 @@ def extract_salary(text: Optional[str]) -> (Optional[float], Optional[float], Op
     """
     if not text:
         return None, None, None
-    t = text.replace('\xa0',' ').replace(',', '').replace('.', '')
+    low = text.lower()
     # common currency
     cur = None
-    if re.search(r'\b(vnd|vnđ|vnđ|đ|dong)\b', text.lower()):
+    if _CUR_VND_RE.search(low):
         cur = "VND"
-    elif re.search(r'\b(us\$|\$|usd)\b', text.lower()):
+    elif _CUR_USD_RE.search(low):
         cur = "USD"
     # find number ranges like 10-20 triệu, 10 đến 20 triệu, từ 10 triệu
     # handle "triệu" -> multiply
-    million = 1
-    if re.search(r'\btriệ(u|o)?\b', text.lower()):
-        million = 1_000_000
-    # find numbers
-    nums = re.findall(r'(\d{1,3}(?:[.,]\d{1,3})?)', text)
-    # also find patterns like "10-20" or "10 - 20"
-    range_match = re.search(r'(\d{1,3}(?:[.,]\d{1,3})?)\s*[-tođến–]\s*(\d{1,3}(?:[.,]\d{1,3})?)', text.replace('–','-'))
+    has_trieu = 'triệu' in low or 'trieu' in low
+    # find patterns like "10-20" or "10 - 20" ('–' đã nằm trong character class, không cần replace)
+    range_match = _RANGE_RE.search(text)
     if range_match:
         a = float(range_match.group(1).replace(',', '.'))
         b = float(range_match.group(2).replace(',', '.'))
         # if 'triệu' detected, scale by 1e6
-        if 'triệu' in text.lower() or 'trieu' in text.lower():
+        if has_trieu:
             a *= 1_000_000
             b *= 1_000_000
             cur = cur or "VND"
         return int(a), int(b), cur
     # if single number with 'triệu' or 'tháng' present
-    if 'triệu' in text.lower() or 'trieu' in text.lower():
-        m = re.search(r'(\d+(?:[.,]\d+)?)', text)
+    if has_trieu:
+        m = _SINGLE_NUM_RE.search(text)
         if m:
             v = float(m.group(1).replace(',', '.')) * 1_000_000
             return int(v), int(v), cur or "VND"
-    # fallback: take first two numbers
+    # fallback: take first two numbers (chỉ quét khi thật sự cần, text có thể là cả trang detail)
+    nums = [m.group(1) for m in islice(_NUMS_RE.finditer(text), 2)]
     if nums:
         try:
             vals = [float(n.replace(',','').replace('.','')) for n in nums]
@@ -178,35 +330,77 @@ COMMON_CITIES = [
     "Bắc Ninh","Binh Duong","Bình Dương","Hai Duong","Đà Lạt"
 ]
 
-def extract_skills(description: Optional[str]) -> Optional[str]:
-    if not description:
-        return None
-    desc = description.lower()
-    found = set()
-    for skill in COMMON_SKILLS:
-        if skill.lower() in desc:
-            found.add(skill)
-    return ",".join(sorted(found)) if found else None
-
-def infer_seniority(description: Optional[str], title: Optional[str]) -> Optional[str]:
-    txt = (title or '') + ' ' + (description or '')
-    txt = txt.lower()
-    if any(k in txt for k in ['senior', 'sr.', 'sr ', 'lead', 'principal', 'trưởng', 'chuyên gia']):
-        return "Senior"
-    if any(k in txt for k in ['mid', 'experienced', 'kỹ sư cấp trung', 'intermediate']):
-        return "Mid"
-    if any(k in txt for k in ['junior', 'jr.', 'jr ', 'mới tốt nghiệp', 'intern', 'thực tập']):
-        return "Junior"
-    return None
+# Keyword -> label, xét theo thứ tự (rule đứng trước thắng, giống if/elif cũ)
+SENIORITY_RULES = [
+    ("Senior", ['senior', 'sr.', 'sr ', 'lead', 'principal', 'trưởng', 'chuyên gia']),
+    ("Mid", ['mid', 'experienced', 'kỹ sư cấp trung', 'intermediate']),
+    ("Junior", ['junior', 'jr.', 'jr ', 'mới tốt nghiệp', 'intern', 'thực tập']),
+]
+EMPLOYMENT_RULES = [
+    ("Part-time", ['part-time', 'bán thời gian', 'part time']),
+    ("Contract", ['contract', 'hợp đồng']),
+]
 
-def infer_employment_type(description: Optional[str], title: Optional[str]) -> Optional[str]:
-    txt = (title or '') + ' ' + (description or '')
-    txt = txt.lower()
-    if 'part-time' in txt or 'bán thời gian' in txt or 'part time' in txt:
-        return "Part-time"
-    if 'contract' in txt or 'hợp đồng' in txt:
-        return "Contract"
-    return "Full-time"
+def _norm(s: str) -> str:
+    return unicodedata.normalize("NFC", s).lower()
+
+def _terms_re(terms) -> re.Pattern:
+    # 1 regex alternation / nhóm keyword -> quét text 1 lần thay vì mỗi keyword 1 lần (vẫn là substring match)
+    return re.compile("|".join(re.escape(t) for t in terms))
+
+# Chuẩn hoá (NFC + lower) các list 1 lần lúc import -> lúc match không phải lower() lại từng term
+_CITY_TERMS = tuple((_norm(c), c) for c in COMMON_CITIES)
+_SKILL_TERMS = tuple(sorted(((_norm(sk), sk) for sk in COMMON_SKILLS), key=lambda t: t[1]))
+_SENIORITY_TERMS = tuple((label, _terms_re(_norm(k) for k in kws)) for label, kws in SENIORITY_RULES)
+_EMPLOYMENT_TERMS = tuple((label, _terms_re(_norm(k) for k in kws)) for label, kws in EMPLOYMENT_RULES)
+
+# ---------- Derived columns (vectorized, chạy 1 lần trên cả batch rows) ----------
+def _lower_col(rows: List[Dict[str,Any]], key: str) -> pd.Series:
+    # site VN đôi khi trả tiếng Việt dạng NFD (dấu tách rời) -> NFC để khớp với term đã chuẩn hoá
+    return pd.Series([r.get(key) or "" for r in rows]).str.normalize("NFC").str.lower()
+
+def _contains(s: pd.Series, term: str) -> np.ndarray:
+    # term đã được _norm() sẵn
+    return s.str.contains(term, regex=False).to_numpy(dtype=bool)
+
+def _matches(s: pd.Series, pattern: re.Pattern) -> np.ndarray:
+    return s.str.contains(pattern).to_numpy(dtype=bool)
+
+def _first_city(s: pd.Series) -> np.ndarray:
+    # city đứng trước trong COMMON_CITIES thắng (np.select lấy condition True đầu tiên)
+    return np.select([_contains(s, term) for term, _ in _CITY_TERMS],
+                     [city for _, city in _CITY_TERMS], default=None)
+
+def enrich_rows(rows: List[Dict[str,Any]]) -> List[Dict[str,Any]]:
+    """Fill city / skills / seniority / employment_type for a whole crawler batch at once."""
+    if not rows:
+        return rows
+    title = _lower_col(rows, "title")
+    desc = _lower_col(rows, "description")
+    loc = _lower_col(rows, "location")
+    blob = title + " " + desc
+
+    # city: location trước, không thấy thì mới tìm trong description
+    city_loc = _first_city(loc)
+    city = np.where(pd.isna(city_loc), _first_city(desc), city_loc)
+
+    # skills: nối các skill có mặt theo thứ tự alphabet -> "pandas,python,sql"
+    acc = np.full(len(rows), "", dtype=object)
+    for term, skill in _SKILL_TERMS:
+        acc = acc + np.where(_contains(desc, term), skill + ",", "")
+    skills = [a[:-1] or None for a in acc]
+
+    seniority = np.select([_matches(blob, kws_re) for _, kws_re in _SENIORITY_TERMS],
+                          [label for label, _ in _SENIORITY_TERMS], default=None)
+    employment = np.select([_matches(blob, kws_re) for _, kws_re in _EMPLOYMENT_TERMS],
+                           [label for label, _ in _EMPLOYMENT_TERMS], default="Full-time")
+
+    for row, c, sk, sen, emp in zip(rows, city, skills, seniority, employment):
+        row["city"] = c
+        row["skills"] = sk
+        row["seniority"] = sen
+        row["employment_type"] = emp
+    return rows
 
 # ---------- Scrapers for each site (requests only) ----------
 # Each returns list[dict] with canonical fields
@@ -222,64 +416,55 @@ def crawl_joboko(max_pages:int=10)->List[Dict[str,Any]]:
         if not html:
             logger.info("Joboko: no response page %s -> stop", p)
             break
-        soup = BeautifulSoup(html, "lxml")
-        cards = soup.select(".job-item, .job-card, .job")
+        tree = parse_html(html)
+        cards = select(tree, ".job-item, .job-card, .job")
         if not cards:
             logger.info("Joboko: no cards on page %s -> stop", p)
             break
+        details = fetch_details(card_href(c, base) for c in cards)
         for c in cards:
             try:
-                a = c.select_one("a")
-                href = a.get("href") if a else None
+                a = select_one(c, "a")
+                href = a.get("href") if a is not None else None
                 if href and href.startswith("/"):
                     href = base + href
-                title = text_clean(a.get_text()) if a else None
-                company = (c.select_one(".company") or c.select_one(".job-company"))
-                company = text_clean(company.get_text()) if company else None
+                title = text_clean(node_text(a)) if a is not None else None
+                company = select_one(c, ".company")
+                if company is None:
+                    company = select_one(c, ".job-company")
+                company = text_clean(node_text(company)) if company is not None else None
                 # fetch detail
                 description=None; posted=None; salary_min=None; salary_max=None; currency=None
                 if href:
-                    det = safe_get_text(href)
+                    det = details.get(href)
                     if det:
-                        dsoup = BeautifulSoup(det, "lxml")
-                        desc_el = dsoup.select_one(".job-description, .description, .detail-content, .info-job")
-                        description = text_clean(desc_el.get_text(" ")) if desc_el else None
+                        dtree = parse_html(det)
+                        desc_el = select_one(dtree, ".job-description, .description, .detail-content, .info-job")
+                        description = text_clean(node_text(desc_el, " ")) if desc_el is not None else None
                         # try salary selectors
-                        sal_el = dsoup.find(text=re.compile(r'lương|salary', re.I))
-                        if sal_el:
-                            SAL = sal_el.parent.get_text(" ")
+                        sal_el = find_text_parent(dtree, _SALARY_LABEL_RE)
+                        if sal_el is not None:
+                            SAL = node_text(sal_el, " ")
                             salary_min, salary_max, currency = extract_salary(SAL)
                         # posted date
-                        date_el = dsoup.select_one(".post-date, .ngay-dang, time")
-                        if date_el:
-                            try:
-                                posted = dateparser.parse(date_el.get_text(), fuzzy=True).isoformat()
-                            except:
-                                posted = None
-                        rand_sleep()
-                loc = c.select_one(".location, .job-location")
-                location = text_clean(loc.get_text()) if loc else None
-                city = guess_city(location, description)
-                skills = extract_skills(description)
-                seniority = infer_seniority(description, title)
-                employment_type = infer_employment_type(description, title)
+                        date_el = select_one(dtree, ".post-date, .ngay-dang, time")
+                        if date_el is not None:
+                            posted = parse_date(node_text(date_el))
+                loc = select_one(c, ".location, .job-location")
+                location = text_clean(node_text(loc)) if loc is not None else None
                 rows.append({
                     "source":"joboko",
-                    "job_id": f"joboko_{abs(hash(href))}" if href else f"joboko_{p}_{random.randint(1,10**6)}",
+                    "job_id": make_job_id("joboko", href, p),
                     "title": title,
                     "company": company,
                     "location": location,
-                    "city": city,
                     "country": CONFIG["COUNTRY"],
                     "posted_date": posted,
                     "expired_date": None,
                     "min_salary": salary_min,
                     "max_salary": salary_max,
                     "currency": currency or "VND",
-                    "employment_type": employment_type,
-                    "seniority": seniority,
                     "description": description,
-                    "skills": skills,
                     "url": href,
                     "scraped_at": now_iso()
                 })
@@ -287,7 +472,7 @@ def crawl_joboko(max_pages:int=10)->List[Dict[str,Any]]:
                 logger.debug("Joboko card parse error: %s", e)
         rand_sleep()
     logger.info("Joboko done: %s rows", len(rows))
-    return rows
+    return enrich_rows(rows)
 
 # JobsGO
 def crawl_jobsgo(max_pages:int=10)->List[Dict[str,Any]]:
@@ -303,61 +488,50 @@ def crawl_jobsgo(max_pages:int=10)->List[Dict[str,Any]]:
         if not html:
             logger.info("JobsGO: no response page %s -> stop", p)
             break
-        soup = BeautifulSoup(html, "lxml")
-        cards = soup.select(".job-item, .list-job-item, .card")
+        tree = parse_html(html)
+        cards = select(tree, ".job-item, .list-job-item, .card")
         if not cards:
             logger.info("JobsGO: no cards page %s -> stop", p)
             break
+        details = fetch_details(card_href(c, base) for c in cards)
         for c in cards:
             try:
-                a = c.select_one("a")
-                href = a.get("href") if a else None
+                a = select_one(c, "a")
+                href = a.get("href") if a is not None else None
                 if href and href.startswith("/"):
                     href = base + href
-                title = text_clean(a.get_text()) if a else None
-                company = c.select_one(".company, .job-company")
-                company = text_clean(company.get_text()) if company else None
+                title = text_clean(node_text(a)) if a is not None else None
+                company = select_one(c, ".company, .job-company")
+                company = text_clean(node_text(company)) if company is not None else None
                 # detail
                 description=None; posted=None; salary_min=None; salary_max=None; currency=None
                 if href:
-                    det = safe_get_text(href)
+                    det = details.get(href)
                     if det:
-                        dsoup = BeautifulSoup(det, "lxml")
-                        desc_el = dsoup.select_one(".job-description, .description, .detail-content")
-                        description = text_clean(desc_el.get_text(" ")) if desc_el else None
+                        dtree = parse_html(det)
+                        desc_el = select_one(dtree, ".job-description, .description, .detail-content")
+                        description = text_clean(node_text(desc_el, " ")) if desc_el is not None else None
                         # salary find
-                        cont_text = dsoup.get_text(" ")
-                        salary_min, salary_max, currency = extract_salary(cont_text)
+                        salary_min, salary_max, currency = extract_salary(salary_text(dtree))
                         # posted date
-                        date_el = dsoup.select_one("time, .posted, .date")
-                        if date_el:
-                            try:
-                                posted = dateparser.parse(date_el.get_text(), fuzzy=True).isoformat()
-                            except:
-                                posted = None
-                    rand_sleep()
-                location = text_clean((c.select_one(".location") or c.select_one(".job-location") or c.select_one(".job-city")).get_text()) if c.select_one(".location") else None
-                city = guess_city(location, description)
-                skills = extract_skills(description)
-                seniority = infer_seniority(description, title)
-                employment_type = infer_employment_type(description, title)
+                        date_el = select_one(dtree, "time, .posted, .date")
+                        if date_el is not None:
+                            posted = parse_date(node_text(date_el))
+                loc = select_one(c, ".location")
+                location = text_clean(node_text(loc)) if loc is not None else None
                 rows.append({
                     "source":"jobsgo",
-                    "job_id": f"jobsgo_{abs(hash(href))}" if href else f"jobsgo_{p}_{random.randint(1,10**6)}",
+                    "job_id": make_job_id("jobsgo", href, p),
                     "title": title,
                     "company": company,
                     "location": location,
-                    "city": city,
                     "country": CONFIG["COUNTRY"],
                     "posted_date": posted,
                     "expired_date": None,
                     "min_salary": salary_min,
                     "max_salary": salary_max,
                     "currency": currency or "VND",
-                    "employment_type": employment_type,
-                    "seniority": seniority,
                     "description": description,
-                    "skills": skills,
                     "url": href,
                     "scraped_at": now_iso()
                 })
@@ -365,7 +539,7 @@ def crawl_jobsgo(max_pages:int=10)->List[Dict[str,Any]]:
                 logger.debug("JobsGO card parse error: %s", e)
         rand_sleep()
     logger.info("JobsGO done: %s rows", len(rows))
-    return rows
+    return enrich_rows(rows)
 
 # TimViecNhanh
 def crawl_timviecnhanh(max_pages:int=10)->List[Dict[str,Any]]:
@@ -378,59 +552,48 @@ def crawl_timviecnhanh(max_pages:int=10)->List[Dict[str,Any]]:
         if not html:
             logger.info("TimViecNhanh: no response page %s -> stop", p)
             break
-        soup = BeautifulSoup(html, "lxml")
-        cards = soup.select(".list_jobbox .jobbox, .job-item, .jobBox")
+        tree = parse_html(html)
+        cards = select(tree, ".list_jobbox .jobbox, .job-item, .jobBox")
         if not cards:
             logger.info("TimViecNhanh: no cards page %s -> stop", p)
             break
+        details = fetch_details(card_href(c, base) for c in cards)
         for c in cards:
             try:
-                a = c.select_one("a")
-                href = a.get("href") if a else None
+                a = select_one(c, "a")
+                href = a.get("href") if a is not None else None
                 if href and href.startswith("/"):
                     href = base + href
-                title = text_clean(a.get_text()) if a else None
-                comp = c.select_one(".companyName, .company")
-                company = text_clean(comp.get_text()) if comp else None
+                title = text_clean(node_text(a)) if a is not None else None
+                comp = select_one(c, ".companyName, .company")
+                company = text_clean(node_text(comp)) if comp is not None else None
                 # detail
                 description=None; posted=None; salary_min=None; salary_max=None; currency=None
                 if href:
-                    det = safe_get_text(href)
+                    det = details.get(href)
                     if det:
-                        dsoup = BeautifulSoup(det, "lxml")
-                        desc_el = dsoup.select_one(".job-description, .description, .content")
-                        description = text_clean(desc_el.get_text(" ")) if desc_el else None
-                        salary_min, salary_max, currency = extract_salary(dsoup.get_text(" "))
-                        date_el = dsoup.select_one(".date, .post-date, time")
-                        if date_el:
-                            try:
-                                posted = dateparser.parse(date_el.get_text(), fuzzy=True).isoformat()
-                            except:
-                                posted = None
-                    rand_sleep()
-                loc = c.select_one(".jobCity, .location")
-                location = text_clean(loc.get_text()) if loc else None
-                skills = extract_skills(description)
-                city = guess_city(location, description)
-                seniority = infer_seniority(description, title)
-                employment_type = infer_employment_type(description, title)
+                        dtree = parse_html(det)
+                        desc_el = select_one(dtree, ".job-description, .description, .content")
+                        description = text_clean(node_text(desc_el, " ")) if desc_el is not None else None
+                        salary_min, salary_max, currency = extract_salary(salary_text(dtree))
+                        date_el = select_one(dtree, ".date, .post-date, time")
+                        if date_el is not None:
+                            posted = parse_date(node_text(date_el))
+                loc = select_one(c, ".jobCity, .location")
+                location = text_clean(node_text(loc)) if loc is not None else None
                 rows.append({
                     "source":"timviecnhanh",
-                    "job_id": f"tvn_{abs(hash(href))}" if href else f"tvn_{p}_{random.randint(1,10**6)}",
+                    "job_id": make_job_id("tvn", href, p),
                     "title": title,
                     "company": company,
                     "location": location,
-                    "city": city,
                     "country": CONFIG["COUNTRY"],
                     "posted_date": posted,
                     "expired_date": None,
                     "min_salary": salary_min,
                     "max_salary": salary_max,
                     "currency": currency or "VND",
-                    "employment_type": employment_type,
-                    "seniority": seniority,
                     "description": description,
-                    "skills": skills,
                     "url": href,
                     "scraped_at": now_iso()
                 })
@@ -438,7 +601,7 @@ def crawl_timviecnhanh(max_pages:int=10)->List[Dict[str,Any]]:
                 logger.debug("TimViecNhanh card error: %s", e)
         rand_sleep()
     logger.info("TimViecNhanh done: %s rows", len(rows))
-    return rows
+    return enrich_rows(rows)
 
 # MyWork
 def crawl_mywork(max_pages:int=10)->List[Dict[str,Any]]:
@@ -451,59 +614,48 @@ def crawl_mywork(max_pages:int=10)->List[Dict[str,Any]]:
         if not html:
             logger.info("MyWork: no response page %s -> stop", p)
             break
-        soup = BeautifulSoup(html, "lxml")
-        cards = soup.select(".job-item, .joblist .item")
+        tree = parse_html(html)
+        cards = select(tree, ".job-item, .joblist .item")
         if not cards:
             logger.info("MyWork: no cards page %s -> stop", p)
             break
+        details = fetch_details(card_href(c, base, "a.job-link, a") for c in cards)
         for c in cards:
             try:
-                a = c.select_one("a.job-link, a")
-                href = a.get("href") if a else None
+                a = select_one(c, "a.job-link, a")
+                href = a.get("href") if a is not None else None
                 if href and href.startswith("/"):
                     href = base + href
-                title = text_clean(a.get_text()) if a else None
-                comp = c.select_one(".company, .company-name")
-                company = text_clean(comp.get_text()) if comp else None
+                title = text_clean(node_text(a)) if a is not None else None
+                comp = select_one(c, ".company, .company-name")
+                company = text_clean(node_text(comp)) if comp is not None else None
                 # detail
                 description=None; posted=None; salary_min=None; salary_max=None; currency=None
                 if href:
-                    det = safe_get_text(href)
+                    det = details.get(href)
                     if det:
-                        dsoup = BeautifulSoup(det, "lxml")
-                        desc_el = dsoup.select_one(".job-description, .description, #job-desc")
-                        description = text_clean(desc_el.get_text(" ")) if desc_el else None
-                        salary_min, salary_max, currency = extract_salary(dsoup.get_text(" "))
-                        date_el = dsoup.select_one(".date, .posted, time")
-                        if date_el:
-                            try:
-                                posted = dateparser.parse(date_el.get_text(), fuzzy=True).isoformat()
-                            except:
-                                posted = None
-                    rand_sleep()
-                loc = c.select_one(".location")
-                location = text_clean(loc.get_text()) if loc else None
-                city = guess_city(location, description)
-                skills = extract_skills(description)
-                seniority = infer_seniority(description, title)
-                employment_type = infer_employment_type(description, title)
+                        dtree = parse_html(det)
+                        desc_el = select_one(dtree, ".job-description, .description, #job-desc")
+                        description = text_clean(node_text(desc_el, " ")) if desc_el is not None else None
+                        salary_min, salary_max, currency = extract_salary(salary_text(dtree))
+                        date_el = select_one(dtree, ".date, .posted, time")
+                        if date_el is not None:
+                            posted = parse_date(node_text(date_el))
+                loc = select_one(c, ".location")
+                location = text_clean(node_text(loc)) if loc is not None else None
                 rows.append({
                     "source":"mywork",
-                    "job_id": f"mywork_{abs(hash(href))}" if href else f"mywork_{p}_{random.randint(1,10**6)}",
+                    "job_id": make_job_id("mywork", href, p),
                     "title": title,
                     "company": company,
                     "location": location,
-                    "city": city,
                     "country": CONFIG["COUNTRY"],
                     "posted_date": posted,
                     "expired_date": None,
                     "min_salary": salary_min,
                     "max_salary": salary_max,
                     "currency": currency or "VND",
-                    "employment_type": employment_type,
-                    "seniority": seniority,
                     "description": description,
-                    "skills": skills,
                     "url": href,
                     "scraped_at": now_iso()
                 })
@@ -511,7 +663,7 @@ def crawl_mywork(max_pages:int=10)->List[Dict[str,Any]]:
                 logger.debug("MyWork card error: %s", e)
         rand_sleep()
     logger.info("MyWork done: %s rows", len(rows))
-    return rows
+    return enrich_rows(rows)
 
 # Vieclam24h
 def crawl_vieclam24h(max_pages:int=10)->List[Dict[str,Any]]:
@@ -524,59 +676,48 @@ def crawl_vieclam24h(max_pages:int=10)->List[Dict[str,Any]]:
         if not html:
             logger.info("Vieclam24h: no response page %s -> stop", p)
             break
-        soup = BeautifulSoup(html, "lxml")
-        cards = soup.select(".jobList li, .box-job, .list-job .item")
+        tree = parse_html(html)
+        cards = select(tree, ".jobList li, .box-job, .list-job .item")
         if not cards:
             logger.info("Vieclam24h: no cards page %s -> stop", p)
             break
+        details = fetch_details(card_href(c, base) for c in cards)
         for c in cards:
             try:
-                a = c.select_one("a")
-                href = a.get("href") if a else None
+                a = select_one(c, "a")
+                href = a.get("href") if a is not None else None
                 if href and href.startswith("/"):
                     href = base + href
-                title = text_clean(a.get_text()) if a else None
-                comp = c.select_one(".company")
-                company = text_clean(comp.get_text()) if comp else None
+                title = text_clean(node_text(a)) if a is not None else None
+                comp = select_one(c, ".company")
+                company = text_clean(node_text(comp)) if comp is not None else None
                 # detail
                 description=None; posted=None; salary_min=None; salary_max=None; currency=None
                 if href:
-                    det = safe_get_text(href)
+                    det = details.get(href)
                     if det:
-                        dsoup = BeautifulSoup(det, "lxml")
-                        desc_el = dsoup.select_one(".job-description, .description, .jobContent")
-                        description = text_clean(desc_el.get_text(" ")) if desc_el else None
-                        salary_min, salary_max, currency = extract_salary(dsoup.get_text(" "))
-                        date_el = dsoup.select_one("time, .date, .posted")
-                        if date_el:
-                            try:
-                                posted = dateparser.parse(date_el.get_text(), fuzzy=True).isoformat()
-                            except:
-                                posted = None
-                    rand_sleep()
-                loc = c.select_one(".local")
-                location = text_clean(loc.get_text()) if loc else None
-                city = guess_city(location, description)
-                skills = extract_skills(description)
-                seniority = infer_seniority(description, title)
-                employment_type = infer_employment_type(description, title)
+                        dtree = parse_html(det)
+                        desc_el = select_one(dtree, ".job-description, .description, .jobContent")
+                        description = text_clean(node_text(desc_el, " ")) if desc_el is not None else None
+                        salary_min, salary_max, currency = extract_salary(salary_text(dtree))
+                        date_el = select_one(dtree, "time, .date, .posted")
+                        if date_el is not None:
+                            posted = parse_date(node_text(date_el))
+                loc = select_one(c, ".local")
+                location = text_clean(node_text(loc)) if loc is not None else None
                 rows.append({
                     "source":"vieclam24h",
-                    "job_id": f"vieclam24h_{abs(hash(href))}" if href else f"vieclam24h_{p}_{random.randint(1,10**6)}",
+                    "job_id": make_job_id("vieclam24h", href, p),
                     "title": title,
                     "company": company,
                     "location": location,
-                    "city": city,
                     "country": CONFIG["COUNTRY"],
                     "posted_date": posted,
                     "expired_date": None,
                     "min_salary": salary_min,
                     "max_salary": salary_max,
                     "currency": currency or "VND",
-                    "employment_type": employment_type,
-                    "seniority": seniority,
                     "description": description,
-                    "skills": skills,
                     "url": href,
                     "scraped_at": now_iso()
                 })
@@ -584,7 +725,7 @@ def crawl_vieclam24h(max_pages:int=10)->List[Dict[str,Any]]:
                 logger.debug("Vieclam24h card error: %s", e)
         rand_sleep()
     logger.info("Vieclam24h done: %s rows", len(rows))
-    return rows
+    return enrich_rows(rows)
 
 # CareerLink
 def crawl_careerlink(max_pages:int=10)->List[Dict[str,Any]]:
@@ -597,59 +738,48 @@ def crawl_careerlink(max_pages:int=10)->List[Dict[str,Any]]:
         if not html:
             logger.info("CareerLink: no response page %s -> stop", p)
             break
-        soup = BeautifulSoup(html, "lxml")
-        cards = soup.select(".job-item, .row-job")
+        tree = parse_html(html)
+        cards = select(tree, ".job-item, .row-job")
         if not cards:
             logger.info("CareerLink: no cards page %s -> stop", p)
             break
+        details = fetch_details(card_href(c, base) for c in cards)
         for c in cards:
             try:
-                a = c.select_one("a")
-                href = a.get("href") if a else None
+                a = select_one(c, "a")
+                href = a.get("href") if a is not None else None
                 if href and href.startswith("/"):
                     href = base + href
-                title = text_clean(a.get_text()) if a else None
-                comp = c.select_one(".company")
-                company = text_clean(comp.get_text()) if comp else None
+                title = text_clean(node_text(a)) if a is not None else None
+                comp = select_one(c, ".company")
+                company = text_clean(node_text(comp)) if comp is not None else None
                 # detail
                 description=None; posted=None; salary_min=None; salary_max=None; currency=None
                 if href:
-                    det = safe_get_text(href)
+                    det = details.get(href)
                     if det:
-                        dsoup = BeautifulSoup(det, "lxml")
-                        desc_el = dsoup.select_one(".job-description, .description, .detail")
-                        description = text_clean(desc_el.get_text(" ")) if desc_el else None
-                        salary_min, salary_max, currency = extract_salary(dsoup.get_text(" "))
-                        date_el = dsoup.select_one(".date, time, .posted")
-                        if date_el:
-                            try:
-                                posted = dateparser.parse(date_el.get_text(), fuzzy=True).isoformat()
-                            except:
-                                posted = None
-                    rand_sleep()
-                loc = c.select_one(".address, .location")
-                location = text_clean(loc.get_text()) if loc else None
-                city = guess_city(location, description)
-                skills = extract_skills(description)
-                seniority = infer_seniority(description, title)
-                employment_type = infer_employment_type(description, title)
+                        dtree = parse_html(det)
+                        desc_el = select_one(dtree, ".job-description, .description, .detail")
+                        description = text_clean(node_text(desc_el, " ")) if desc_el is not None else None
+                        salary_min, salary_max, currency = extract_salary(salary_text(dtree))
+                        date_el = select_one(dtree, ".date, time, .posted")
+                        if date_el is not None:
+                            posted = parse_date(node_text(date_el))
+                loc = select_one(c, ".address, .location")
+                location = text_clean(node_text(loc)) if loc is not None else None
                 rows.append({
                     "source":"careerlink",
-                    "job_id": f"careerlink_{abs(hash(href))}" if href else f"careerlink_{p}_{random.randint(1,10**6)}",
+                    "job_id": make_job_id("careerlink", href, p),
                     "title": title,
                     "company": company,
                     "location": location,
-                    "city": city,
                     "country": CONFIG["COUNTRY"],
                     "posted_date": posted,
                     "expired_date": None,
                     "min_salary": salary_min,
                     "max_salary": salary_max,
                     "currency": currency or "VND",
-                    "employment_type": employment_type,
-                    "seniority": seniority,
                     "description": description,
-                    "skills": skills,
                     "url": href,
                     "scraped_at": now_iso()
                 })
@@ -657,7 +787,7 @@ def crawl_careerlink(max_pages:int=10)->List[Dict[str,Any]]:
                 logger.debug("CareerLink card error: %s", e)
         rand_sleep()
     logger.info("CareerLink done: %s rows", len(rows))
-    return rows
+    return enrich_rows(rows)
 
 # ChoTot API
 def crawl_chotot(max_pages:int=5)->List[Dict[str,Any]]:
@@ -667,7 +797,7 @@ def crawl_chotot(max_pages:int=5)->List[Dict[str,Any]]:
     for p in range(0, max_pages):
         params = {"keyword":"data", "page": p, "size": 30}
         try:
-            r = requests.get(base, params=params, headers=headers(), timeout=CONFIG["TIMEOUT"])
+            r = SESSION.get(base, params=params, headers=headers(), timeout=CONFIG["TIMEOUT"])
             if r.status_code != 200:
                 logger.warning("ChoTot API page %s -> status %s", p, r.status_code)
                 break
@@ -681,25 +811,19 @@ def crawl_chotot(max_pages:int=5)->List[Dict[str,Any]]:
                     description = text_clean(ad.get("description") or "")
                     location = ad.get("area_name") or ad.get("province_name")
                     salary_min, salary_max, currency = extract_salary(ad.get("salary") or description or "")
-                    skills = extract_skills(description)
-                    city = guess_city(location, description)
                     rows.append({
                         "source":"chotot",
                         "job_id": f"chotot_{ad.get('list_id') or random.randint(1,10**9)}",
                         "title": text_clean(title),
                         "company": None,
                         "location": location,
-                        "city": city,
                         "country": CONFIG["COUNTRY"],
                         "posted_date": None,
                         "expired_date": None,
                         "min_salary": salary_min,
                         "max_salary": salary_max,
                         "currency": currency or "VND",
-                        "employment_type": infer_employment_type(description, title),
-                        "seniority": infer_seniority(description, title),
                         "description": description,
-                        "skills": skills,
                         "url": f"https://www.chotot.com/{ad.get('list_id')}" if ad.get('list_id') else None,
                         "scraped_at": now_iso()
                     })
@@ -710,90 +834,87 @@ def crawl_chotot(max_pages:int=5)->List[Dict[str,Any]]:
             break
         rand_sleep()
     logger.info("ChoTot done: %s rows", len(rows))
-    return rows
+    return enrich_rows(rows)
 
 # ---------------- Merge & Save ----------------
-def save_csv(rows: List[Dict[str,Any]], filename: str):
-    df = pd.DataFrame(rows)
-    # ensure columns
-    for c in FIELDS:
-        if c not in df.columns:
-            df[c] = None
-    df = df[FIELDS]
+def rows_to_table(rows: List[Dict[str,Any]]) -> pa.Table:
+    # key thiếu -> null; schema cố định nên các source concat được với nhau
+    return pa.Table.from_pylist(rows, schema=VN_SCHEMA)
+
+def save_csv(table: pa.Table, filename: str):
     path = Path(CONFIG["OUTPUT_DIR"]) / filename
-    df.to_csv(path, index=False, encoding="utf-8-sig")
-    logger.info("Saved %s rows to %s", len(df), path)
-
-def dedupe_merge(all_rows: List[Dict[str,Any]]) -> pd.DataFrame:
-    if not all_rows:
-        return pd.DataFrame(columns=FIELDS)
-    df = pd.DataFrame(all_rows)
-    for c in FIELDS:
-        if c not in df.columns:
-            df[c] = None
-    df["url_norm"] = df["url"].fillna("").astype(str)
-    df["key"] = df.apply(lambda r: r["url_norm"] if r["url_norm"] else f'{(r.get("title") or "").strip().lower()}|{(r.get("company") or "").strip().lower()}|{(r.get("location") or "").strip().lower()}', axis=1)
-    df = df.drop_duplicates(subset=["key"]).drop(columns=["url_norm","key"])
-    df = df[FIELDS].reset_index(drop=True)
-    return df
+    with open(path, "wb") as f:
+        f.write("\ufeff".encode("utf-8"))  # BOM giống utf-8-sig để Excel đọc đúng tiếng Việt
+        pa_csv.write_csv(table, f)
+    logger.info("Saved %s rows to %s", table.num_rows, path)
+
+def save_parquet_partition(table: pa.Table):
+    # Mỗi source 1 partition hive (source=<name>/), chạy lại chỉ thay partition của source đó
+    pa_ds.write_dataset(
+        table, PARQUET_DATASET_DIR, format="parquet",
+        partitioning=["source"], partitioning_flavor="hive",
+        basename_template="part-{i}.parquet",
+        existing_data_behavior="delete_matching",
+    )
+    logger.info("Saved %s rows to %s", table.num_rows, PARQUET_DATASET_DIR)
+
+def _norm_key_part(col: pa.ChunkedArray) -> pa.ChunkedArray:
+    return pc.utf8_lower(pc.utf8_trim_whitespace(pc.fill_null(col, "")))
+
+def dedupe_merge(tables: List[pa.Table]) -> pa.Table:
+    if not tables:
+        return VN_SCHEMA.empty_table()
+    table = pa.concat_tables(tables)  # zero-copy, không dựng lại rows dict
+    # key: url nếu có, không thì title|company|location (lower + strip)
+    url = pc.fill_null(table["url"], "")
+    fallback = pc.binary_join_element_wise(
+        _norm_key_part(table["title"]), _norm_key_part(table["company"]), _norm_key_part(table["location"]), "|"
+    )
+    key = pc.if_else(pc.not_equal(url, ""), url, fallback)
+    # dictionary_encode = factorize trong Arrow -> so trùng trên mã int32, không kéo key string ra object array
+    codes = pc.dictionary_encode(key.combine_chunks()).indices.to_numpy()
+    first_seen = np.zeros(len(codes), dtype=bool)
+    first_seen[np.unique(codes, return_index=True)[1]] = True
+    return table.filter(pa.array(first_seen))
 
 # ---------------- Main orchestration ----------------
-def main():
-    all_rows: List[Dict[str,Any]] = []
-
-    try:
-        jbk = crawl_joboko(CONFIG["JOBOKO_PAGES"])
-        save_csv(jbk, "joboko_jobs.csv")
-        all_rows.extend(jbk)
-    except Exception as e:
-        logger.exception("Joboko failed: %s", e)
-
-    try:
-        jsg = crawl_jobsgo(CONFIG["JOBS_GO_PAGES"])
-        save_csv(jsg, "jobsgo_jobs.csv")
-        all_rows.extend(jsg)
-    except Exception as e:
-        logger.exception("JobsGO failed: %s", e)
-
-    try:
-        tvn = crawl_timviecnhanh(CONFIG["TIMVIECNHANH_PAGES"])
-        save_csv(tvn, "timviecnhanh_jobs.csv")
-        all_rows.extend(tvn)
-    except Exception as e:
-        logger.exception("TimViecNhanh failed: %s", e)
-
-    try:
-        myw = crawl_mywork(CONFIG["MYWORK_PAGES"])
-        save_csv(myw, "mywork_jobs.csv")
-        all_rows.extend(myw)
-    except Exception as e:
-        logger.exception("MyWork failed: %s", e)
-
-    try:
-        v24 = crawl_vieclam24h(CONFIG["VIECLAM24H_PAGES"])
-        save_csv(v24, "vieclam24h_jobs.csv")
-        all_rows.extend(v24)
-    except Exception as e:
-        logger.exception("Vieclam24h failed: %s", e)
+# (label, crawler, CONFIG pages key, output file) — giữ thứ tự này khi merge
+SOURCES = [
+    ("Joboko", crawl_joboko, "JOBOKO_PAGES", "joboko_jobs.csv"),
+    ("JobsGO", crawl_jobsgo, "JOBS_GO_PAGES", "jobsgo_jobs.csv"),
+    ("TimViecNhanh", crawl_timviecnhanh, "TIMVIECNHANH_PAGES", "timviecnhanh_jobs.csv"),
+    ("MyWork", crawl_mywork, "MYWORK_PAGES", "mywork_jobs.csv"),
+    ("Vieclam24h", crawl_vieclam24h, "VIECLAM24H_PAGES", "vieclam24h_jobs.csv"),
+    ("CareerLink", crawl_careerlink, "CAREERLINK_PAGES", "careerlink_jobs.csv"),
+    ("ChoTot", crawl_chotot, "CHOTOT_PAGES", "chotot_jobs.csv"),
+]
 
-    try:
-        cl = crawl_careerlink(CONFIG["CAREERLINK_PAGES"])
-        save_csv(cl, "careerlink_jobs.csv")
-        all_rows.extend(cl)
-    except Exception as e:
-        logger.exception("CareerLink failed: %s", e)
+def run_source(crawl_fn, pages_key: str, filename: str) -> pa.Table:
+    # Ghi ngay khi source xong -> main chỉ giữ Arrow table (columnar), không giữ list dict
+    table = rows_to_table(crawl_fn(CONFIG[pages_key]))
+    save_csv(table, filename)
+    save_parquet_partition(table)
+    return table
 
-    try:
-        ct = crawl_chotot(CONFIG["CHOTOT_PAGES"])
-        save_csv(ct, "chotot_jobs.csv")
-        all_rows.extend(ct)
-    except Exception as e:
-        logger.exception("ChoTot failed: %s", e)
+def main():
+    tables: List[pa.Table] = []
+
+    # Mỗi site 1 thread (I/O-bound, host độc lập); 1 site lỗi không kéo các site khác
+    with ThreadPoolExecutor(max_workers=CONFIG["SOURCE_WORKERS"]) as ex:
+        futures = [
+            (label, ex.submit(run_source, crawl_fn, pages_key, filename))
+            for label, crawl_fn, pages_key, filename in SOURCES
+        ]
+        for label, fut in futures:
+            try:
+                tables.append(fut.result())
+            except Exception as e:
+                logger.exception("%s failed: %s", label, e)
 
     # merge & dedupe
-    merged = dedupe_merge(all_rows)
-    save_csv(merged.to_dict("records"), "merged_vn_jobs_full.csv")
-    logger.info("DONE. Total merged rows: %s", len(merged))
+    merged = dedupe_merge(tables)
+    save_csv(merged, "merged_vn_jobs_full.csv")
+    logger.info("DONE. Total merged rows: %s", merged.num_rows)
 
 if __name__ == "__main__":
     main()
@@ -22,7 +22,9 @@ Behavior:
 """
 
 import sys
-import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+from openpyxl import load_workbook
 from pathlib import Path
 
 # ======================================================
@@ -57,16 +59,58 @@ mapped_count = len(mapped_files)
 # ROW COUNT HELPERS
 # ======================================================
 
+# Chỉ cần số dòng: không dựng DataFrame / suy luận dtype.
+# CSV: đếm record bằng tokenizer C của pyarrow (chỉ giữ cột đầu, dạng binary -> không decode,
+# không convert) - vẫn đúng khi description có xuống dòng trong ngoặc kép, điều mà đếm b"\n" không làm được.
+# XLSX: openpyxl read_only lấy max_row từ dimension của sheet, không parse cell.
+CSV_COUNT_READ_OPTIONS = pa_csv.ReadOptions(
+    autogenerate_column_names=True,  # header được đếm như 1 record -> trừ ra ở dưới
+    block_size=1 << 24,
+)
+CSV_COUNT_CONVERT_OPTIONS = pa_csv.ConvertOptions(
+    include_columns=["f0"],
+    column_types={"f0": pa.binary()},
+)
+
+def count_csv_rows(file_path: Path) -> int:
+    # Row lệch số cột so với header (file export bẩn, dấu phẩy thừa cuối dòng...) pyarrow không nhận
+    # → handler bỏ qua row đó nhưng vẫn đếm, để tổng khớp với đếm theo pandas
+    invalid_rows = 0
+
+    def count_invalid(row):
+        nonlocal invalid_rows
+        invalid_rows += 1
+        return "skip"
+
+    reader = pa_csv.open_csv(
+        file_path,
+        read_options=CSV_COUNT_READ_OPTIONS,
+        parse_options=pa_csv.ParseOptions(
+            newlines_in_values=True,
+            invalid_row_handler=count_invalid,
+        ),
+        convert_options=CSV_COUNT_CONVERT_OPTIONS,
+    )
+    return sum(batch.num_rows for batch in reader) + invalid_rows - 1
+
+def count_xlsx_rows(file_path: Path) -> int:
+    wb = load_workbook(file_path, read_only=True)
+    try:
+        ws = wb.worksheets[0]  # giống pd.read_excel (sheet đầu tiên)
+        n_rows = ws.max_row
+        if n_rows is None:  # file không ghi dimension -> phải duyệt row
+            n_rows = sum(1 for _ in ws.iter_rows(values_only=True))
+        return max(n_rows - 1, 0)  # trừ header
+    finally:
+        wb.close()
+
 def count_rows(file_path: Path) -> int:
     try:
         if file_path.suffix.lower() == ".csv":
-            total = 0
-            for chunk in pd.read_csv(file_path, chunksize=100_000, low_memory=False):
-                total += len(chunk)
-            return total
+            return count_csv_rows(file_path)
 
         elif file_path.suffix.lower() == ".xlsx":
-            return len(pd.read_excel(file_path))
+            return count_xlsx_rows(file_path)
 
     except Exception:
         return -1  # error marker
@@ -28,6 +28,12 @@ import pandas as pd
 import re
 from pathlib import Path
 
+try:
+    import ahocorasick  # pyahocorasick: quét N keyword trong 1 lượt
+    HAS_AHOCORASICK = True
+except ImportError:
+    HAS_AHOCORASICK = False
+
 # =========================
 # PATHS
 # =========================
@@ -100,15 +106,17 @@ city_alias_df = pd.read_csv(
     REF_DIR / "city_alias_reference.csv",
     dtype=str
 )
+_PUNCT_RE = re.compile(r"[^\w\s]")
+_WS_RE = re.compile(r"\s+")
+
 def normalize_text(x):
-    x = str(x)
-    x = re.sub(r"[^\w\s]", "", x)
-    return re.sub(r"\s+", " ", x).strip().lower()
+    return _WS_RE.sub(" ", _PUNCT_RE.sub("", str(x))).strip().lower()
 
-CITY_ALIAS_LOOKUP = {
-    normalize_text(row.alias): row.canonical_city
-    for row in city_alias_df.itertuples(index=False)
-}
+# ~1M alias -> map thẳng trên cột, không dựng namedtuple từng row (itertuples)
+CITY_ALIAS_LOOKUP = dict(zip(
+    map(normalize_text, city_alias_df["alias"]),
+    city_alias_df["canonical_city"]
+))
 
 # =========================
 # LOAD SKILL MAPPING
@@ -219,6 +227,69 @@ for _, row in level_df.iterrows():
         "keywords": [k.strip() for k in row["keywords"].lower().split("|")]
     })
 
+# =========================
+# KEYWORD MATCHERS (AHO–CORASICK)
+# =========================
+# `for kw in keywords: if kw in text` = 1 lần quét text / keyword (city alias ~1M).
+# Automaton tìm mọi keyword có trong text trong 1 lượt; keyword đứng trước trong mapping vẫn thắng.
+# Không có pyahocorasick → giữ vòng lặp substring như cũ (kết quả giống hệt).
+
+def build_automaton(keywords: list):
+    """keyword -> index đầu tiên của nó trong list (index nhỏ = ưu tiên). Bỏ keyword rỗng."""
+    automaton = ahocorasick.Automaton()
+    for idx, kw in enumerate(keywords):
+        if kw and kw not in automaton:
+            automaton.add_word(kw, idx)
+    if len(automaton) == 0:
+        return None
+    automaton.make_automaton()
+    return automaton
+
+def make_first_match(pairs: list):
+    """
+    pairs = [(keyword, label), ...] theo thứ tự ưu tiên.
+    Trả về hàm text -> label của keyword đứng trước nhất có trong text (None nếu không có).
+    """
+    keywords = [kw for kw, _ in pairs]
+    labels = [label for _, label in pairs]
+    automaton = build_automaton(keywords) if HAS_AHOCORASICK else None
+
+    if automaton is None:
+        def first_match(text: str):
+            for kw, label in pairs:
+                if kw in text:
+                    return label
+            return None
+        return first_match
+
+    # "" in text luôn True → keyword rỗng khớp mọi text
+    always = keywords.index("") if "" in keywords else None
+
+    def first_match(text: str):
+        best = always
+        for _, idx in automaton.iter(text):
+            if best is None or idx < best:
+                best = idx
+        return None if best is None else labels[best]
+    return first_match
+
+CITY_FIRST_MATCH = make_first_match(list(CITY_ALIAS_LOOKUP.items()))
+COUNTRY_FIRST_MATCH = make_first_match(list(COUNTRY_LOOKUP.items()))
+EDU_FIRST_MATCH = make_first_match([(kw, row["level"]) for row in EDU_MAPPING for kw in row["keywords"]])
+INDUSTRY_FIRST_MATCH = make_first_match([(kw, row["industry"]) for row in INDUSTRY_MAPPING for kw in row["keywords"]])
+COMPANY_SIZE_FIRST_MATCH = make_first_match([(kw, row["size"]) for row in COMPANY_SIZE_MAPPING for kw in row["keywords"]])
+EMPLOYMENT_FIRST_MATCH = make_first_match([(kw, row["type"]) for row in EMPLOYMENT_MAPPING for kw in row["keywords"]])
+LEVEL_FIRST_MATCH = make_first_match([(kw, row["level"]) for row in LEVEL_MAPPING for kw in row["keywords"]])
+
+# Skill: cần biết từng alias / strong / exclude có mặt hay không → lấy set keyword có trong text
+R_STRONG_TERMS = ["rstudio", "rlang", "r programming"]
+SKILL_TERMS = [
+    kw
+    for s in SKILL_MAPPING
+    for kw in s["aliases"] + s["strong"] + s["exclude"]
+] + R_STRONG_TERMS
+SKILL_AUTOMATON = build_automaton(SKILL_TERMS) if HAS_AHOCORASICK else None
+
 # =========================
 # HELPERS
 # =========================
@@ -235,16 +306,10 @@ def extract_remote(text: str):
     return any(k in text for k in REMOTE_KEYWORDS)
 
 def extract_country(text: str):
-    for c in COUNTRY_LOOKUP:
-        if c in text:
-            return COUNTRY_LOOKUP[c]
-    return None
+    return COUNTRY_FIRST_MATCH(text)
 
 def extract_city(text: str):
-    for alias, canonical in CITY_ALIAS_LOOKUP.items():
-        if alias in text:
-            return canonical
-    return None
+    return CITY_FIRST_MATCH(text)
 
 def extract_salary_from_text(desc, cur_min, cur_max, NA="__NA__"):
     text = str(desc).lower()
@@ -317,32 +382,40 @@ def extract_skills(text: str, role_context: str):
     found = set()
     text = text.lower()
 
-    for s in SKILL_MAPPING:
-        def match_r_skill(text: str, role_context: str):
-            # R standalone, uppercase
-            if re.search(r'\bR\b', role_context):
-                return True
+    # has(k) == (k in text): 1 lượt automaton cho mọi term của mọi skill
+    if SKILL_AUTOMATON is not None:
+        present = {SKILL_TERMS[idx] for _, idx in SKILL_AUTOMATON.iter(text)}
+        present.add("")
+        has = present.__contains__
+    else:
+        has = text.__contains__
+
+    def match_r_skill(role_context: str):
+        # R standalone, uppercase
+        if re.search(r'\bR\b', role_context):
+            return True
 
-            # R strong context
-            if any(k in text for k in ["rstudio", "rlang", "r programming"]):
-                return True
+        # R strong context
+        if any(has(k) for k in R_STRONG_TERMS):
+            return True
 
-            return False
+        return False
 
+    for s in SKILL_MAPPING:
         # Special handling for R
         if s["canonical"] == "R":
-            if not match_r_skill(text, role_context):
+            if not match_r_skill(role_context):
                 continue
         else:
-            if not any(a in text for a in s["aliases"]):
+            if not any(has(a) for a in s["aliases"]):
                 continue
 
         # normal body rule
-        if s["strong"] and not any(k in text for k in s["strong"]):
+        if s["strong"] and not any(has(k) for k in s["strong"]):
             continue
 
 
-        if s["exclude"] and any(k in text for k in s["exclude"]):
+        if s["exclude"] and any(has(k) for k in s["exclude"]):
             continue
 
         found.add(s["canonical"])
@@ -457,24 +530,12 @@ def extract_experience_years(text: str, NA="__NA__"):
     return NA
 
 def extract_education_level(text: str, NA="__NA__"):
-    text = text.lower()
-
-    for row in EDU_MAPPING:
-        for kw in row["keywords"]:
-            if kw in text:
-                return row["level"]
-
-    return NA
+    level = EDU_FIRST_MATCH(text.lower())
+    return NA if level is None else level
 
 def extract_industry(text: str, NA="__NA__"):
-    text = text.lower()
-
-    for row in INDUSTRY_MAPPING:
-        for kw in row["keywords"]:
-            if kw in text:
-                return row["industry"]
-
-    return NA
+    industry = INDUSTRY_FIRST_MATCH(text.lower())
+    return NA if industry is None else industry
 
 def extract_company_size(text: str, NA="__NA__"):
     text = text.lower()
@@ -509,32 +570,16 @@ def extract_company_size(text: str, NA="__NA__"):
                 return "Enterprise"
 
     # ===== 2. KEYWORD FALLBACK =====
-    for row in COMPANY_SIZE_MAPPING:
-        for kw in row["keywords"]:
-            if kw in text:
-                return row["size"]
-
-    return NA
+    size = COMPANY_SIZE_FIRST_MATCH(text)
+    return NA if size is None else size
 
 def extract_employment_type(text: str, NA="__NA__"):
-    text = text.lower()
-
-    for row in EMPLOYMENT_MAPPING:
-        for kw in row["keywords"]:
-            if kw in text:
-                return row["type"]
-
-    return NA
+    emp = EMPLOYMENT_FIRST_MATCH(text.lower())
+    return NA if emp is None else emp
 
 def extract_job_level(text: str, NA="__NA__"):
-    text = text.lower()
-
-    for row in LEVEL_MAPPING:
-        for kw in row["keywords"]:
-            if kw in text:
-                return row["level"]
-
-    return NA
+    level = LEVEL_FIRST_MATCH(text.lower())
+    return NA if level is None else level
 
 # =========================
 # PROCESS SINGLE FILE
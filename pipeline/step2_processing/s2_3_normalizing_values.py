@@ -472,13 +472,15 @@ if not CITY_ALIAS_PATH.exists():
 alias_df = pd.read_csv(CITY_ALIAS_PATH, dtype=str)
 
 # alias_norm -> canonical_city
-CITY_ALIAS_LOOKUP = {
-    normalize_text(alias): canonical
-    for canonical, alias in zip(
-        alias_df["canonical_city"],
-        alias_df["alias"]
-    )
-}
+# Series (index = alias đã normalize) để downstream dùng .map() thay vì tra dict từng row.
+# Key vẫn normalize bằng normalize_text (Python re): str.replace của pandas/Arrow dùng RE2,
+# \w chỉ ASCII -> làm mất chữ có dấu không tách được (đ, ø, ...).
+# keep="last" = giống dict comprehension cũ (alias trùng thì dòng sau ghi đè).
+CITY_ALIAS_LOOKUP = pd.Series(
+    alias_df["canonical_city"].to_numpy(),
+    index=alias_df["alias"].map(normalize_text),
+)
+CITY_ALIAS_LOOKUP = CITY_ALIAS_LOOKUP[~CITY_ALIAS_LOOKUP.index.duplicated(keep="last")]
 
 CITIES_REF_PATH = REF_DIR / "cities.csv"
 
@@ -488,9 +490,20 @@ cities_df = pd.read_csv(CITIES_REF_PATH, dtype=str)
 cities_df["name_norm"] = cities_df["city_name"].apply(normalize_text)
 
 # norm_name -> official city name (GeoNames)
-CITY_NAME_LOOKUP = dict(
-    zip(cities_df["name_norm"], cities_df["city_name"])
+CITY_NAME_LOOKUP = pd.Series(
+    cities_df["city_name"].to_numpy(),
+    index=cities_df["name_norm"],
 )
+CITY_NAME_LOOKUP = CITY_NAME_LOOKUP[~CITY_NAME_LOOKUP.index.duplicated(keep="last")]
+
+# alias_norm -> official city name: ghép 2 lookup 1 lần lúc load,
+# chỉ giữ alias có canonical city tìm được trong cities.csv
+# (canonical ít giá trị khác nhau -> chỉ normalize mỗi canonical 1 lần)
+_canonical_unique = CITY_ALIAS_LOOKUP.unique()
+_canonical_norm = CITY_ALIAS_LOOKUP.map(
+    dict(zip(_canonical_unique, map(normalize_text, _canonical_unique)))
+)
+CITY_ALIAS_TO_NAME = _canonical_norm.map(CITY_NAME_LOOKUP).dropna()
 
 # =========================
 # LOAD CURRENCY MAPPING
@@ -674,22 +687,9 @@ def normalize_city_file(file_path: Path):
 
     city_norm = city_before.apply(normalize_text)
 
-    normalized_city = []
-
-    for raw, norm in zip(city_before, city_norm):
-        if norm == "__NA__":
-            normalized_city.append("__NA__")
-        elif norm in CITY_ALIAS_LOOKUP:
-            alias_canonical = CITY_ALIAS_LOOKUP[norm]
-            alias_norm = normalize_text(alias_canonical)
-
-            if alias_norm in CITY_NAME_LOOKUP:
-                normalized_city.append(CITY_NAME_LOOKUP[alias_norm])
-            else:
-                normalized_city.append("__UNMATCHED__")
-
-        else:
-            normalized_city.append("__UNMATCHED__")
+    # alias -> canonical -> official name: 1 lần .map() trên cả cột (lookup đã ghép sẵn lúc load)
+    normalized_city = city_norm.map(CITY_ALIAS_TO_NAME).fillna("__UNMATCHED__")
+    normalized_city = normalized_city.where(city_norm != "__NA__", "__NA__")
 
     df["city"] = normalized_city
 
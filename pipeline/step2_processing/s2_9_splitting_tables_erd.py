@@ -81,6 +81,8 @@ Rules:
 """
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
 from pathlib import Path
 
 # =========================
@@ -117,12 +119,36 @@ EMPLOYMENT_TYPES = {'Full-time','Part-time','Internship','Temporary'}
 JOB_LEVELS = {'Intern','Junior','Mid','Senior','Lead'}
 REMOTE_OPTIONS = {'Onsite','Hybrid','Remote'}
 
-NA_SET = {"__NA__", "__INVALID__", "__UNMATCHED__", "", None}
-
-def to_null(v):
-    if pd.isna(v) or str(v).strip() in NA_SET:
-        return None
-    return v
+NA_SET = frozenset({"__NA__", "__INVALID__", "__UNMATCHED__", "", None})
+NA_STRINGS = [v for v in NA_SET if v is not None]
+
+# Các helper dưới đây chạy trên cả cột (vectorized), không xét từng row
+def na_mask(s: pd.Series) -> pd.Series:
+    # Cột số / datetime (salary, exp years... read_csv engine C đã parse ra số) không thể chứa
+    # marker dạng chuỗi -> chỉ cần isna, khỏi astype(str) tạo 1 string cho mỗi ô
+    if s.dtype.kind in "biufcmM":
+        return s.isna()
+    return s.isna() | s.astype(str).str.strip().isin(NA_STRINGS)
+
+def to_null(s: pd.Series) -> pd.Series:
+    return s.where(~na_mask(s))
+
+def enum_or_null(s: pd.Series, allowed: set) -> pd.Series:
+    return s.where(s.isin(allowed))
+
+def save_csv_arrow(df: pd.DataFrame, path: Path):
+    """Bảng junction (chỉ int id + enum) nhiều row nhất -> ghi bằng writer C++ của pyarrow"""
+    with open(path, "wb") as f:
+        f.write("\ufeff".encode("utf-8"))  # BOM giống utf-8-sig
+        pa_csv.write_csv(pa.Table.from_pandas(df, preserve_index=False), f)
+
+def explode_pipe(s: pd.Series, job_ids: pd.Series) -> pd.DataFrame:
+    """'a | b' -> 1 row / item (giữ thứ tự row rồi thứ tự item), kèm job_id, item đã strip"""
+    items = s.astype(str).str.split("|")
+    out = pd.DataFrame({"job_id": job_ids, "item": items})[s.notna()]
+    out = out.explode("item", ignore_index=True)
+    out["item"] = out["item"].astype(str).str.strip()
+    return out
 
 # =========================
 # LOAD
@@ -132,6 +158,8 @@ def load_combined():
     files = list(INPUT_DIR.glob("*.csv"))
     if not files:
         raise FileNotFoundError("No combined CSV files found")
+    # Giữ engine C mặc định: engine="pyarrow" không bật newlines_in_values,
+    # job_description có xuống dòng trong ngoặc kép -> lỗi khi file lớn hơn 1 block
     return pd.concat(
         [pd.read_csv(f, encoding="utf-8-sig") for f in files],
         ignore_index=True
@@ -167,203 +195,138 @@ def run():
     df = df.drop(columns=["__source_id", "__source_name"], errors="ignore")
 
     # =========================
-    # JOB-LEVEL COUNTERS
+    # DROP JOB – NO COMPANY
     # =========================
-    dropped_job_no_company = 0
-    dropped_job_all_na = 0
+    no_company = na_mask(df["company_name"])
+    dropped_job_no_company = int(no_company.sum())
 
     # =========================
-    # ID MAPS
+    # DROP JOB – ALL NA / INVALID
     # =========================
-    skill_map = {}
-    company_map = {}
-    location_map = {}
-    role_map = {}
+    # Row còn lại luôn có company_name hợp lệ -> không thể all-NA, giữ counter cho summary
+    dropped_job_all_na = 0
+
+    df = df[~no_company].reset_index(drop=True)
+    job_ids = pd.Series(range(1, len(df) + 1))
 
     # =========================
-    # TABLE BUFFERS
+    # COMPANY (id theo thứ tự xuất hiện đầu tiên)
     # =========================
-    skills = []
-    companies = []
-    locations = []
-    roles = []
-    job_postings = []
-    job_skills = []
-    job_roles = []
-    job_levels = []
-
-    dim_countries = []   # ✅ ADD (BI DIMENSION)
-
-    skill_id = company_id = location_id = role_id = job_id = 1
-
-    for _, r in df.iterrows():
-
-        # =========================
-        # DROP JOB – NO COMPANY
-        # =========================
-        if pd.isna(r["company_name"]) or str(r["company_name"]).strip() in NA_SET:
-            dropped_job_no_company += 1
-            continue
-
-        # =========================
-        # DROP JOB – ALL NA / INVALID
-        # =========================
-        meaningful_values = [
-            v for v in r.values
-            if pd.notna(v) and str(v).strip() not in NA_SET
-        ]
-        if not meaningful_values:
-            dropped_job_all_na += 1
-            continue
-
-        # =========================
-        # COMPANY
-        # =========================
-        if r["company_name"] not in company_map:
-            company_map[r["company_name"]] = company_id
-            companies.append({
-                "company_id": company_id,
-                "company_name": r["company_name"],
-                "company_size": r["company_size"] if r["company_size"] in COMPANY_SIZES else None,
-                "industry": r["industry"] if r["industry"] in INDUSTRIES else None
-            })
-            company_id += 1
-
-        # =========================
-        # LOCATION
-        # =========================
-        loc_key = (r["city"], r["country"], r["country_iso"])
-        if loc_key not in location_map:
-            location_map[loc_key] = location_id
-            locations.append({
-                "location_id": location_id,
-                "city": to_null(r["city"]),
-                "country": to_null(r["country"]),
-                "country_iso": to_null(r["country_iso"]),
-                "latitude": r["latitude"] if pd.notna(r["latitude"]) else None,
-                "longitude": r["longitude"] if pd.notna(r["longitude"]) else None,
-                "population": r["population"] if pd.notna(r["population"]) else None
-            })
-            location_id += 1
-
-        # =========================
-        # JOB_POSTINGS
-        # =========================
-        job_postings.append({
-            "job_id": job_id,
-            "company_id": company_map[r["company_name"]],
-            "location_id": location_map[loc_key],
-            "posted_date": to_null(r["posted_date"]),
-            "min_salary": to_null(r["min_salary"]),
-            "max_salary": to_null(r["max_salary"]),
-            "currency": to_null(r["currency"]),
-            "required_exp_years": to_null(r["required_exp_years"]),
-            "education_level": r["education_level"] if r["education_level"] in EDUCATION_LEVELS else None,
-            "employment_type": r["employment_type"] if r["employment_type"] in EMPLOYMENT_TYPES else None,
-            "job_description": to_null(r["job_description"]),
-            "remote_option": r["remote_option"] if r["remote_option"] in REMOTE_OPTIONS else None
-        })
-
-        # =========================
-        # SKILLS (N–N) – CANONICAL CATEGORY ONLY
-        # =========================
-        if (
-            pd.notna(r["skill_name"])
-            and str(r["skill_name"]).strip() != "__NA__"
-        ):
-            raw_skills = [
-                s.strip()
-                for s in str(r["skill_name"]).split("|")
-                if s.strip() and s.strip() != "__NA__"
-            ]
-
-            for skill in raw_skills:
-                if skill not in SKILL_TO_CATEGORY:
-                    continue
-
-                if skill not in skill_map:
-                    skill_map[skill] = skill_id
-                    skills.append({
-                        "skill_id": skill_id,
-                        "skill_name": skill,
-                        "skill_category": SKILL_TO_CATEGORY[skill]
-                    })
-                    skill_id += 1
-
-                job_skills.append({
-                    "job_id": job_id,
-                    "skill_id": skill_map[skill]
-                })
-
-        # =========================
-        # ROLES (N–N)
-        # =========================
-        if pd.notna(r["role_name"]):
-            for role in [x.strip() for x in str(r["role_name"]).split("|")]:
-                if role not in ROLE_ENUM:
-                    continue
-                if role not in role_map:
-                    role_map[role] = role_id
-                    roles.append({"role_id": role_id, "role_name": role})
-                    role_id += 1
-                job_roles.append({"job_id": job_id, "role_id": role_map[role]})
-
-        # =========================
-        # LEVEL
-        # =========================
-        if r["job_level"] in JOB_LEVELS:
-            job_levels.append({
-                "job_id": job_id,
-                "job_level": r["job_level"]
-            })
-
-        job_id += 1
+    company_codes, _ = pd.factorize(df["company_name"])
+    df["company_id"] = company_codes + 1
+    first_company = df.drop_duplicates("company_id")
+    companies = pd.DataFrame({
+        "company_id": first_company["company_id"],
+        "company_name": first_company["company_name"],
+        "company_size": enum_or_null(first_company["company_size"], COMPANY_SIZES),
+        "industry": enum_or_null(first_company["industry"], INDUSTRIES)
+    })
 
     # =========================
-    # DIM_COUNTRIES (FROM LOCATIONS)
+    # LOCATION
     # =========================
+    df["location_id"] = df.groupby(
+        ["city", "country", "country_iso"], sort=False, dropna=False
+    ).ngroup() + 1
+    first_location = df.drop_duplicates("location_id")
+    locations = pd.DataFrame({
+        "location_id": first_location["location_id"],
+        "city": to_null(first_location["city"]),
+        "country": to_null(first_location["country"]),
+        "country_iso": to_null(first_location["country_iso"]),
+        "latitude": first_location["latitude"],
+        "longitude": first_location["longitude"],
+        "population": first_location["population"]
+    })
 
-    seen_countries = set()
-
-    for loc in locations:
-        country = loc["country"]
-        country_iso = loc["country_iso"]
+    # =========================
+    # JOB_POSTINGS
+    # =========================
+    job_postings = pd.DataFrame({
+        "job_id": job_ids,
+        "company_id": df["company_id"],
+        "location_id": df["location_id"],
+        "posted_date": to_null(df["posted_date"]),
+        "min_salary": to_null(df["min_salary"]),
+        "max_salary": to_null(df["max_salary"]),
+        "currency": to_null(df["currency"]),
+        "required_exp_years": to_null(df["required_exp_years"]),
+        "education_level": enum_or_null(df["education_level"], EDUCATION_LEVELS),
+        "employment_type": enum_or_null(df["employment_type"], EMPLOYMENT_TYPES),
+        "job_description": to_null(df["job_description"]),
+        "remote_option": enum_or_null(df["remote_option"], REMOTE_OPTIONS)
+    })
 
-        if not country or not country_iso:
-            continue
+    # =========================
+    # SKILLS (N–N) – CANONICAL CATEGORY ONLY
+    # =========================
+    job_skill_items = explode_pipe(df["skill_name"], job_ids)
+    job_skill_items = job_skill_items[job_skill_items["item"].isin(SKILL_TO_CATEGORY.keys())]
+    skill_codes, skill_names = pd.factorize(job_skill_items["item"])
+    skills = pd.DataFrame({
+        "skill_id": range(1, len(skill_names) + 1),
+        "skill_name": skill_names,
+        "skill_category": skill_names.map(SKILL_TO_CATEGORY)
+    })
+    job_skills = pd.DataFrame({
+        "job_id": job_skill_items["job_id"].to_numpy(),
+        "skill_id": skill_codes + 1
+    })
 
-        key = (country, country_iso)
-        if key in seen_countries:
-            continue
+    # =========================
+    # ROLES (N–N)
+    # =========================
+    job_role_items = explode_pipe(df["role_name"], job_ids)
+    job_role_items = job_role_items[job_role_items["item"].isin(ROLE_ENUM)]
+    role_codes, role_names = pd.factorize(job_role_items["item"])
+    roles = pd.DataFrame({
+        "role_id": range(1, len(role_names) + 1),
+        "role_name": role_names
+    })
+    job_roles = pd.DataFrame({
+        "job_id": job_role_items["job_id"].to_numpy(),
+        "role_id": role_codes + 1
+    })
 
-        seen_countries.add(key)
+    # =========================
+    # LEVEL
+    # =========================
+    has_level = df["job_level"].isin(JOB_LEVELS)
+    job_levels = pd.DataFrame({
+        "job_id": job_ids[has_level],
+        "job_level": df.loc[has_level, "job_level"]
+    })
 
-        iso_lower = country_iso.lower()
+    # =========================
+    # DIM_COUNTRIES (FROM LOCATIONS)
+    # =========================
 
-        dim_countries.append({
-            "country": country,
-            "country_iso": country_iso,
-            "country_iso_lower": iso_lower,
-            "flag_url": f"https://flagcdn.com/w40/{iso_lower}.png"
-        })
+    dim_countries = (
+        locations[["country", "country_iso"]]
+        .dropna()
+        .drop_duplicates()
+    )
+    dim_countries["country_iso_lower"] = dim_countries["country_iso"].astype(str).str.lower()
+    dim_countries["flag_url"] = "https://flagcdn.com/w40/" + dim_countries["country_iso_lower"] + ".png"
 
     # =========================
     # SAVE
     # =========================
 
-    pd.DataFrame(skills).to_csv(OUTPUT_DIR / "skills.csv", index=False, encoding="utf-8-sig")
-    pd.DataFrame(companies).to_csv(OUTPUT_DIR / "companies.csv", index=False, encoding="utf-8-sig")
-    pd.DataFrame(locations).to_csv(OUTPUT_DIR / "locations.csv", index=False, encoding="utf-8-sig")
-    pd.DataFrame(roles).to_csv(OUTPUT_DIR / "role_names.csv", index=False, encoding="utf-8-sig")
-    pd.DataFrame(job_postings).to_csv(OUTPUT_DIR / "job_postings.csv", index=False, encoding="utf-8-sig")
-    pd.DataFrame(job_skills).to_csv(OUTPUT_DIR / "job_skills.csv", index=False, encoding="utf-8-sig")
-    pd.DataFrame(job_roles).to_csv(OUTPUT_DIR / "job_roles.csv", index=False, encoding="utf-8-sig")
-    pd.DataFrame(job_levels).to_csv(OUTPUT_DIR / "job_levels.csv", index=False, encoding="utf-8-sig")
+    skills.to_csv(OUTPUT_DIR / "skills.csv", index=False, encoding="utf-8-sig", lineterminator="\n")
+    companies.to_csv(OUTPUT_DIR / "companies.csv", index=False, encoding="utf-8-sig", lineterminator="\n")
+    locations.to_csv(OUTPUT_DIR / "locations.csv", index=False, encoding="utf-8-sig", lineterminator="\n")
+    roles.to_csv(OUTPUT_DIR / "role_names.csv", index=False, encoding="utf-8-sig", lineterminator="\n")
+    job_postings.to_csv(OUTPUT_DIR / "job_postings.csv", index=False, encoding="utf-8-sig", lineterminator="\n")
+    save_csv_arrow(job_skills, OUTPUT_DIR / "job_skills.csv")
+    save_csv_arrow(job_roles, OUTPUT_DIR / "job_roles.csv")
+    save_csv_arrow(job_levels, OUTPUT_DIR / "job_levels.csv")
 
-    pd.DataFrame(dim_countries).to_csv(
+    dim_countries.to_csv(
         OUTPUT_DIR / "dim_countries.csv",
         index=False,
-        encoding="utf-8-sig"
+        encoding="utf-8-sig",
+        lineterminator="\n"
     )
 
     # =========================